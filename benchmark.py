@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+QUERIES = [
+    "spicy North Indian food", "best rooftop pizza", "cheap south indian breakfast", "chicken biryani",
+    "romantic dinner with a view", "craft beer and burgers", "authentic chinese noodles", "ghee roast",
+    "vegetarian thali", "desserts and coffee", "kebabs late night", "healthy salads", "masala dosa",
+    "family restaurant with buffet", "sushi", "cafe to work from", "street food chaat", "seafood curry",
+    "pasta and wine", "filter coffee and idli",
+]
+
+
+def latency_stats(samples_ms):
+    samples = np.asarray(samples_ms, dtype='float64')
+    return {
+        'n': int(len(samples)),
+        'mean_ms': float(samples.mean()),
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'max_ms': float(samples.max()),
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def filter_scenarios(searcher):
+    # The busiest location gives the location-only case a realistic candidate set
+    location = searcher.filters.location_names[int(np.argmax([len(p) for p in searcher.filters.location_postings]))]
+    return {
+        'none': {},
+        'location': {'location': location},
+        'location_price_rating': {'location': location, 'max_price': 800, 'min_rating': 4.0},
+        'no_match': {'location': location, 'max_price': 1, 'min_rating': 4.9},
+    }
+
+
+def bench_search(vector_store_path='vector_store', repeats=5, top_k=5, query_cache=False, mmap=True):
+    """p50/p95/p99 of RestaurantSearch.search per filter combination."""
+    from src.vector_db.search import RestaurantSearch
+
+    start = time.perf_counter()
+    # With the query cache off every call pays for the encoder, the worst case for a new query
+    searcher = RestaurantSearch(vector_store_path=vector_store_path, mmap=mmap,
+                                query_cache_size=1024 if query_cache else 0)
+    load_s = time.perf_counter() - start
+    searcher.search(QUERIES[0], top_k=top_k)  # warm-up
+
+    results = {'load_s': load_s, 'rows': searcher.num_rows, 'scenarios': {}}
+    for name, filters in filter_scenarios(searcher).items():
+        samples = []
+        for _ in range(repeats):
+            for query in QUERIES:
+                t0 = time.perf_counter()
+                searcher.search(query, top_k=top_k, **filters)
+                samples.append((time.perf_counter() - t0) * 1000)
+        results['scenarios'][name] = dict(latency_stats(samples), filters=filters)
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def bench_ingest(data_path, rows=2000, index_type='flat'):
+    """Docs/s for a full (non-incremental) vector store build over the first `rows` documents."""
+    from src.data.artifacts import read_processed, write_processed
+    from src.vector_db.ingest import initialize_vector_db
+
+    workdir = tempfile.mkdtemp(prefix='bench_ingest_')
+    try:
+        sample = read_processed(data_path).head(rows)
+        sample_path = os.path.join(workdir, 'sample.parquet')
+        write_processed(sample, sample_path)
+        start = time.perf_counter()
+        initialize_vector_db(data_path=sample_path, output_dir=os.path.join(workdir, 'store'),
+                             index_type=index_type, incremental=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {'docs': len(sample), 'seconds': elapsed, 'docs_per_s': len(sample) / elapsed,
+            'index_type': index_type, 'peak_rss_mb': peak_rss_mb()}
+
+
+class StubLLM:
+    """Canned Groq stand-in, so /recommend timings measure our stack rather than the network."""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_s = latency_ms / 1000
+
+    def generate_recommendation(self, user_query, restaurants_context, max_tokens=None):
+        time.sleep(self.latency_s)
+        return "Stub recommendation"
+
+    async def agenerate_recommendation(self, user_query, restaurants_context, max_tokens=None):
+        await asyncio.sleep(self.latency_s)
+        return "Stub recommendation"
+
+
+def bench_api(vector_store_path='vector_store', requests=200, llm_latency_ms=0.0):
+    """End-to-end POST /recommend through the ASGI stack with a stubbed LLM."""
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+    from src.llm.recommender import RecommendationEngine
+
+    def factory():
+        engine = RecommendationEngine(vector_store_path=vector_store_path, mmap=True)
+        engine.llm = StubLLM(llm_latency_ms)
+        engine.warm_up()
+        return engine
+
+    app.state.engine_factory = factory
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        while client.get("/readyz").json()["status"] == "starting":
+            time.sleep(0.05)
+        startup_s = time.perf_counter() - start
+        if client.get("/readyz").status_code != 200:
+            raise RuntimeError(f"engine failed to start: {client.get('/readyz').json()}")
+        samples = []
+        for i in range(requests):
+            payload = {'query': QUERIES[i % len(QUERIES)]}
+            if i % 2:
+                payload['max_price'] = 800
+            t0 = time.perf_counter()
+            response = client.post("/recommend", json=payload)
+            samples.append((time.perf_counter() - t0) * 1000)
+            response.raise_for_status()
+    app.state.engine_factory = None
+    return dict(latency_stats(samples), startup_s=startup_s, llm_latency_ms=llm_latency_ms,
+                peak_rss_mb=peak_rss_mb())
+
+
+def run_isolated(fn, **kwargs):
+    # A fresh interpreter per component, so peak RSS belongs to that component alone
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(fn, **kwargs).result()
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nChange vs {baseline_path}:")
+    for name, stats in current.get('search', {}).get('scenarios', {}).items():
+        before = baseline.get('search', {}).get('scenarios', {}).get(name)
+        if before:
+            print(f"  search/{name}: p95 {before['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+    for component in ('ingest', 'api'):
+        if component in current and component in baseline:
+            key = 'docs_per_s' if component == 'ingest' else 'p95_ms'
+            print(f"  {component}: {key} {baseline[component][key]:.2f} -> {current[component][key]:.2f}, "
+                  f"peak RSS {baseline[component]['peak_rss_mb']:.0f} -> {current[component]['peak_rss_mb']:.0f} MB")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    from src.data.artifacts import PROCESSED_PATH
+
+    parser = argparse.ArgumentParser(description="Retrieval, ingest and end-to-end latency / memory benchmarks")
+    parser.add_argument('--components', nargs='+', choices=['search', 'ingest', 'api'],
+                        default=['search', 'ingest', 'api'])
+    parser.add_argument('--vector-store', default='vector_store')
+    parser.add_argument('--repeats', type=int, default=5, help="Passes over the query set per filter scenario")
+    parser.add_argument('--query-cache', action='store_true', help="Keep the query-embedding cache on")
+    parser.add_argument('--ingest-rows', type=int, default=2000)
+    parser.add_argument('--index-type', default='flat')
+    parser.add_argument('--requests', type=int, default=200, help="/recommend calls")
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help="Simulated LLM time per call")
+    parser.add_argument('--output', default=None, help="JSON path (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument('--baseline', default=None, help="Earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'config': vars(args),
+    }
+    if 'search' in args.components:
+        print("Benchmarking search...")
+        report['search'] = run_isolated(bench_search, vector_store_path=args.vector_store, repeats=args.repeats,
+                                        query_cache=args.query_cache)
+        for name, stats in report['search']['scenarios'].items():
+            print(f"  {name:<22} p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  p99 {stats['p99_ms']:7.2f} ms")
+    if 'ingest' in args.components:
+        print("Benchmarking ingest...")
+        report['ingest'] = run_isolated(bench_ingest, data_path=PROCESSED_PATH, rows=args.ingest_rows,
+                                        index_type=args.index_type)
+        print(f"  {report['ingest']['docs_per_s']:.1f} docs/s")
+    if 'api' in args.components:
+        print("Benchmarking /recommend...")
+        report['api'] = run_isolated(bench_api, vector_store_path=args.vector_store, requests=args.requests,
+                                     llm_latency_ms=args.llm_latency_ms)
+        print(f"  p50 {report['api']['p50_ms']:.2f}  p95 {report['api']['p95_ms']:.2f} ms")
+
+    output = args.output or os.path.join('benchmark_results', f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    if args.baseline:
+        compare(report, args.baseline)
@@ -18,15 +18,16 @@ def run_final_audit():
     }
 
     # 1. Phase 1 Audit
-    processed_csv = 'processed_data/restaurants_processed.csv'
-    if os.path.exists(processed_csv):
-        df = pd.read_csv(processed_csv)
-        if len(df) > 50000:
+    processed_file = 'processed_data/restaurants_processed.parquet'
+    if os.path.exists(processed_file):
+        from src.data.artifacts import read_processed
+        df = read_processed(processed_file, columns=['name'])
+        if len(df) > 10000:
             status["Phase 1: Data"] = f"✅ ({len(df)} restaurants processed)"
 
     # 2. Phase 2 Audit
     faiss_idx = 'vector_store/restaurant_index.faiss'
-    metadata = 'vector_store/metadata.pkl'
+    metadata = 'vector_store/metadata.arrow'
     if os.path.exists(faiss_idx) and os.path.exists(metadata):
         status["Phase 2: Vector DB"] = "✅ (FAISS Index & Metadata ready)"
 
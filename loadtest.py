@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from benchmark import QUERIES, latency_stats
+
+
+def default_payload(i):
+    payload = {'query': f"{QUERIES[i % len(QUERIES)]} #{i}"}
+    if i % 3 == 1:
+        payload['max_price'] = 800
+    return payload
+
+
+async def run_load(client, path='/recommend', rps=10.0, duration_s=30.0, payload_fn=default_payload,
+                   timeout_s=30.0):
+    """Open-loop load: request i is sent at start + i / rps whether or not earlier ones finished.
+
+    Latency is measured from the scheduled send time, so a backed-up server shows up in the tail
+    instead of silently lowering the offered rate.
+    """
+    results = []
+
+    async def one(i, scheduled):
+        try:
+            response = await client.post(path, json=payload_fn(i), timeout=timeout_s)
+            status = response.status_code
+            # Upstream throttling, timeouts and failures come back as 503 / 504 / 502
+            error = None if status < 400 else response.text[:200]
+        except httpx.HTTPError as e:
+            status, error = 'exception', f"{type(e).__name__}: {e}"
+        results.append({'status': status, 'latency_ms': (time.perf_counter() - scheduled) * 1000, 'error': error})
+
+    start = time.perf_counter()
+    tasks = []
+    total = int(rps * duration_s)
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i, scheduled)))
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed_s, target_rps):
+    statuses = {}
+    for result in results:
+        statuses[str(result['status'])] = statuses.get(str(result['status']), 0) + 1
+    ok = [r['latency_ms'] for r in results if r['status'] == 200]
+    errors = len(results) - len(ok)
+    summary = {
+        'target_rps': target_rps,
+        'requests': len(results),
+        'elapsed_s': elapsed_s,
+        'throughput_rps': len(ok) / elapsed_s if elapsed_s else 0.0,
+        'error_rate': errors / len(results) if results else 0.0,
+        'statuses': statuses,
+        'latency': latency_stats(ok) if ok else None,
+    }
+    samples = [r['error'] for r in results if r['error']][:5]
+    if samples:
+        summary['error_samples'] = samples
+    return summary
+
+
+def wait_ready(url, timeout_s=300):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become ready within {timeout_s}s")
+
+
+def start_stack(args):
+    """Fake Groq + the API under uvicorn, wired together through GROQ_BASE_URL."""
+    fake = subprocess.Popen([
+        sys.executable, '-m', 'src.llm.fake_groq', '--port', str(args.fake_port),
+        '--latency-ms', str(args.llm_latency_ms), '--latency-dist', args.llm_latency_dist,
+        '--tokens-per-s', str(args.tokens_per_s), '--rate-429', str(args.rate_429),
+        '--rate-5xx', str(args.rate_5xx), '--seed', '0',
+    ])
+    env = dict(os.environ, GROQ_BASE_URL=f"http://127.0.0.1:{args.fake_port}", GROQ_API_KEY='fake-key')
+    if not args.allow_cache:
+        # Every request should reach the (fake) LLM; cached answers would flatter the numbers
+        env['RESPONSE_CACHE_SIZE'] = '0'
+        env.pop('RESPONSE_CACHE_PATH', None)
+    api = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'src.api.main:app', '--port', str(args.api_port),
+                            '--workers', str(args.api_workers), '--log-level', 'warning'], env=env)
+    wait_ready(f"http://127.0.0.1:{args.fake_port}/stats")
+    wait_ready(f"http://127.0.0.1:{args.api_port}/readyz")
+    return [fake, api]
+
+
+async def main(args):
+    url = args.url or f"http://127.0.0.1:{args.api_port}"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+        results, elapsed = await run_load(client, path=args.path, rps=args.rps, duration_s=args.duration,
+                                          timeout_s=args.timeout)
+    return summarize(results, elapsed, args.rps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive /recommend at a target RPS against a local fake Groq")
+    parser.add_argument('--url', default=None, help="Existing API to load; by default the stack is started here")
+    parser.add_argument('--path', default='/recommend', choices=['/recommend', '/recommend/stream'])
+    parser.add_argument('--rps', type=float, default=20.0)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--api-port', type=int, default=8000)
+    parser.add_argument('--api-workers', type=int, default=1)
+    parser.add_argument('--fake-port', type=int, default=8001)
+    parser.add_argument('--llm-latency-ms', type=float, default=300.0)
+    parser.add_argument('--llm-latency-dist', default='lognormal')
+    parser.add_argument('--tokens-per-s', type=float, default=400.0)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-5xx', type=float, default=0.0)
+    parser.add_argument('--allow-cache', action='store_true', help="Keep the LLM response cache enabled")
+    parser.add_argument('--output', default=None, help="JSON path (default: benchmark_results/loadtest_<timestamp>.json)")
+    args = parser.parse_args()
+
+    processes = [] if args.url else start_stack(args)
+    try:
+        summary = asyncio.run(main(args))
+    finally:
+        for process in processes:
+            process.terminate()
+    summary['config'] = vars(args)
+    print(json.dumps({k: v for k, v in summary.items() if k != 'config'}, indent=2))
+
+    output = args.output or os.path.join('benchmark_results', f"loadtest_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"Results written to {output}")
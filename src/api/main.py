@@ -1,18 +1,80 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
+import asyncio
 import os
 import sys
+import json
+import math
+import time
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from src.llm.recommender import RecommendationEngine
+from src.llm.errors import LLMError
+from src.metrics import REGISTRY, histogram, server_timing_header, start_request_timings
 
-app = FastAPI(title="AI Restaurant Recommendation Service")
+HTTP_SECONDS = histogram('restaurant_http_request_duration_seconds', "End-to-end HTTP request time",
+                         ['method', 'path', 'status'])
 
-# Initialize engine
-engine = RecommendationEngine()
+def build_engine():
+    # Imported here rather than at module level: the engine pulls in faiss, the embedding model
+    # and the index, none of which importing the app (tests, tooling) should pay for
+    from src.llm.recommender import RecommendationEngine
+
+    # Memory-mapped, so every uvicorn worker shares the same index pages
+    engine = RecommendationEngine(mmap=True)
+    engine.warm_up()
+    return engine
+
+async def _load_engine(app):
+    start = time.perf_counter()
+    try:
+        factory = getattr(app.state, 'engine_factory', None) or build_engine
+        app.state.engine = await asyncio.get_running_loop().run_in_executor(None, factory)
+        print(f"Engine ready in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        app.state.startup_error = str(e)
+        print(f"Engine failed to start: {e}")
+
+@asynccontextmanager
+async def lifespan(app):
+    # The engine loads in the background so /healthz answers immediately and /readyz reports
+    # "starting" until the index is loaded and warmed up
+    app.state.engine = None
+    app.state.startup_error = None
+    loading = asyncio.create_task(_load_engine(app))
+    yield
+    if not loading.done():
+        loading.cancel()
+    if app.state.engine is not None:
+        await app.state.engine.aclose()
+
+app = FastAPI(title="AI Restaurant Recommendation Service", lifespan=lifespan)
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    # Stages timed anywhere below (encode, index_search, context, llm, ...) land in this dict and
+    # come back as a Server-Timing header. Streaming responses send headers before the body, so
+    # for them the header only covers the work done before the first byte.
+    timings = start_request_timings()
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    route = request.scope.get('route')
+    HTTP_SECONDS.observe(elapsed, method=request.method, path=getattr(route, 'path', 'unmatched'),
+                         status=response.status_code)
+    response.headers['Server-Timing'] = server_timing_header(dict(timings, total=elapsed))
+    return response
+
+@app.exception_handler(LLMError)
+async def llm_error(request: Request, exc: LLMError):
+    # Upstream trouble gets a status that says what happened (throttled 503, deadline 504, failed 502)
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, headers=headers,
+                        content={"detail": str(exc), "error": type(exc).__name__})
 
 class UserPreferences(BaseModel):
     query: str
@@ -22,22 +84,84 @@ class UserPreferences(BaseModel):
 class RecommendationResponse(BaseModel):
     recommendation: str
 
+def get_engine(request: Request):
+    engine = getattr(request.app.state, 'engine', None)
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Service is starting up, try again shortly")
+    return engine
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the AI Restaurant Recommendation API"}
 
+@app.get("/healthz")
+def healthz():
+    # Liveness: the process is up and serving HTTP
+    return {"status": "ok"}
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text exposition; per process, so scrape each uvicorn worker
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/readyz")
+def readyz(request: Request):
+    # Readiness: the engine is loaded and warmed up, so traffic can be routed here
+    if getattr(request.app.state, 'engine', None) is not None:
+        return {"status": "ready"}
+    error = getattr(request.app.state, 'startup_error', None)
+    if error:
+        return JSONResponse(status_code=503, content={"status": "failed", "detail": error})
+    return JSONResponse(status_code=503, content={"status": "starting"})
+
 @app.post("/recommend", response_model=RecommendationResponse)
-def get_recommendation(prefs: UserPreferences):
+async def get_recommendation(prefs: UserPreferences, request: Request):
+    engine = get_engine(request)
     try:
-        response = engine.get_recommendations(
+        response = await engine.aget_recommendations(
             query=prefs.query,
             location=prefs.location,
             max_price=prefs.max_price
         )
         return RecommendationResponse(recommendation=response)
+    except LLMError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _sse_events(first_token, tokens):
+    # Server-sent events: one `data:` frame per token, then a terminating `done` event
+    try:
+        if first_token is not None:
+            yield f"data: {json.dumps({'token': first_token})}\n\n"
+            async for token in tokens:
+                yield f"data: {json.dumps({'token': token})}\n\n"
+    except LLMError as e:
+        yield f"event: error\ndata: {json.dumps({'detail': str(e), 'error': type(e).__name__})}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    yield "event: done\ndata: {}\n\n"
+
+@app.post("/recommend/stream")
+async def stream_recommendation(prefs: UserPreferences, request: Request):
+    engine = get_engine(request)
+    tokens = engine.astream_recommendations(
+        query=prefs.query,
+        location=prefs.location,
+        max_price=prefs.max_price
+    )
+    # Wait for the first token before sending headers, so throttling or a timeout before any
+    # output is reported with a proper status code instead of inside a 200 stream
+    try:
+        first_token = await anext(tokens)
+    except StopAsyncIteration:
+        first_token = None
+    return StreamingResponse(
+        _sse_events(first_token, tokens),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
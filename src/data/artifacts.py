@@ -0,0 +1,98 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROCESSED_PATH = 'processed_data/restaurants_processed.parquet'
+# Raw listing row -> row of its canonical restaurant in the processed dataset
+DEDUP_MAPPING_PATH = 'processed_data/dedup_mapping.parquet'
+
+# Explicit types for the columns the pipeline relies on; any other dataset column is kept
+# with the type Arrow infers for it
+PROCESSED_SCHEMA = pa.schema([
+    ('name', pa.string()),
+    ('location', pa.string()),
+    ('rest_type', pa.string()),
+    ('cuisines', pa.string()),
+    ('dish_liked', pa.string()),
+    ('rate_float', pa.float64()),
+    ('approx_cost_two', pa.int64()),
+    ('document_string', pa.string()),
+    ('listed_in_types', pa.string()),
+    ('listed_in_cities', pa.string()),
+])
+
+METADATA_SCHEMA = pa.schema([
+    ('name', pa.string()),
+    ('location', pa.string()),
+    ('rate_float', pa.float64()),
+    ('approx_cost_two', pa.int64()),
+    ('cuisines', pa.string()),
+    ('dish_liked', pa.string()),
+    ('document_string', pa.string()),
+])
+METADATA_COLUMNS = METADATA_SCHEMA.names
+
+DEDUP_MAPPING_SCHEMA = pa.schema([
+    ('canonical_row', pa.int64()),
+    ('source_row', pa.int64()),
+])
+
+
+def _typed_table(df, schema):
+    fields = [schema.field(name) for name in schema.names if name in df.columns]
+    extra = [col for col in df.columns if col not in schema.names]
+    typed = pa.Table.from_pandas(df[[f.name for f in fields]], schema=pa.schema(fields), preserve_index=False)
+    for col in extra:
+        typed = typed.append_column(col, pa.Array.from_pandas(df[col]))
+    return typed
+
+
+def _write_parquet(table, path):
+    # Written next to the target and renamed into place, so readers never see a partial file
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_processed(df, path=PROCESSED_PATH):
+    """Write the preprocessed dataset as Parquet with the explicit processed schema."""
+    _write_parquet(_typed_table(df, PROCESSED_SCHEMA), path)
+
+
+def write_dedup_mapping(mapping, path=DEDUP_MAPPING_PATH):
+    """Write the listing -> canonical restaurant mapping produced by deduplication."""
+    _write_parquet(_typed_table(mapping[DEDUP_MAPPING_SCHEMA.names], DEDUP_MAPPING_SCHEMA), path)
+
+
+def read_processed(path=PROCESSED_PATH, columns=None):
+    """Read the preprocessed dataset, decoding only the requested columns."""
+    if path.endswith('.csv'):
+        return pd.read_csv(path, usecols=columns)
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def write_metadata(df, path):
+    # Uncompressed Arrow IPC file: readers can memory-map it and share the pages across processes
+    table = _typed_table(df[METADATA_COLUMNS], METADATA_SCHEMA)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def open_metadata(path, memory_map=True):
+    """Open the metadata Arrow file as a table; memory-mapped tables are zero-copy."""
+    source = pa.memory_map(path, 'r') if memory_map else pa.OSFile(path, 'rb')
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_metadata(path, columns=None):
+    """Metadata as a DataFrame, materialising only `columns` (all by default)."""
+    table = open_metadata(path)
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
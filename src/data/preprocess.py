@@ -1,9 +1,160 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from datasets import load_dataset
 import os
+import sys
 from tqdm import tqdm
 
-def load_and_preprocess_data(dataset_name="ManikaSaini/zomato-restaurant-recommendation"):
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.data.artifacts import PROCESSED_PATH, write_dedup_mapping, write_processed
+
+# Plain decimal literals, cast in bulk by Arrow. Anything else float()/int() also accepts (1_000,
+# inf, nan, non-ASCII digits) is rare and goes through Python per distinct value, so the result
+# matches the row-wise parsers. Integers outside int64 are the one exception: they become 0
+FLOAT_LITERAL = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+INT_LITERAL = r'^-?\d{1,18}$'
+
+def _string_values(series):
+    # Arrow view of the str values in a column (null elsewhere) plus a mask of which rows were str
+    values = series.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        is_str = ~pd.isna(values)
+    else:
+        # Mixed-type column: fall back to a per-element type check
+        is_str = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    strings = pa.array(np.where(is_str, values, None), type=pa.string())
+    return values, strings, is_str
+
+def _convert(convert, text, default):
+    try:
+        return convert(text)
+    except (ValueError, OverflowError):
+        return default
+
+def _parse(strings, literal, arrow_type, convert, default):
+    # Parse stripped strings as float()/int() would; nulls and unparseable values become `default`
+    strings = pc.utf8_trim_whitespace(strings)
+    ok = pc.fill_null(pc.match_substring_regex(strings, literal), False)
+    out = pc.cast(pc.if_else(ok, strings, None), arrow_type).fill_null(default).to_numpy(zero_copy_only=False)
+    rest = np.flatnonzero(~ok.to_numpy(zero_copy_only=False) & pc.is_valid(strings).to_numpy(zero_copy_only=False))
+    if len(rest):
+        out = out.copy()
+        texts = strings.take(pa.array(rest)).to_pylist()
+        to_dtype = out.dtype.type
+        lookup = {text: _convert(lambda t: to_dtype(convert(t)), text, default) for text in set(texts)}
+        out[rest] = [lookup[text] for text in texts]
+    return out
+
+def _numeric(values, mask):
+    out = np.full(len(values), np.nan)
+    if mask.any():
+        out[mask] = pd.to_numeric(pd.Series(values[mask], dtype=object), errors='coerce').to_numpy(dtype='float64')
+    return out
+
+def clean_rate_column(rate):
+    # Vectorized clean_rate: "4.1/5" -> 4.1, "NEW"/"-"/unparseable -> 0.0, None -> 0.0
+    values, strings, is_str = _string_values(rate)
+    head = pc.replace_substring_regex(strings, r'(?s)/.*', '')
+    parsed = _parse(head, FLOAT_LITERAL, pa.float64(), float, 0.0)
+    # Non-string values keep the original semantics: None -> 0.0, otherwise float(value)
+    is_none = np.equal(values, None)
+    numeric = _numeric(values, ~is_str & ~is_none)
+    return pd.Series(np.where(is_str, parsed, np.where(is_none, 0.0, numeric)), index=rate.index, dtype='float64')
+
+def clean_cost_column(cost):
+    # Vectorized clean_cost: "1,200" -> 1200, unparseable -> 0, None -> 0
+    values, strings, is_str = _string_values(cost)
+    digits = pc.replace_substring(strings, ',', '')
+    parsed = _parse(digits, INT_LITERAL, pa.int64(), int, 0)
+    numeric = np.trunc(np.nan_to_num(_numeric(values, ~is_str), nan=0.0))
+    return pd.Series(np.where(is_str, parsed, numeric), index=cost.index).astype('int64')
+
+def _text(series):
+    # Column formatted the way an f-string would (None -> 'None', NaN -> 'nan'),
+    # calling str() once per distinct value rather than once per row
+    if isinstance(series.dtype, pd.StringDtype):
+        # Already Arrow-backed strings; missing entries of this dtype surface as NaN
+        return pc.fill_null(pa.array(series.array), 'nan')
+    codes, uniques = pd.factorize(series)
+    text = np.array([str(u) for u in uniques] + ['nan'], dtype=object)[codes]
+    if (codes < 0).any():
+        text[np.equal(series.to_numpy(dtype=object), None)] = 'None'
+    return pa.array(text, type=pa.string())
+
+def _join(*parts):
+    return pc.binary_join_element_wise(*parts, '')
+
+def build_document_strings(df):
+    # Vectorized create_doc_string: Arrow string concatenation with masked optional sentences
+    cost = df['approx_cost_two']
+    liked = _text(df['dish_liked'])
+    doc = _join(_text(df['name']), " is a ", _text(df['rest_type']), " specializing in ", _text(df['cuisines']),
+                ", located in ", _text(df['location']), ". ",
+                "It has a rating of ", _text(df['rate_float']), "/5.0. ")
+    cost_sentence = _join("The approximate cost for two people is ₹", _text(cost), ". ")
+    doc = _join(doc, pc.if_else(pa.array((cost > 0).to_numpy()), cost_sentence, ""))
+    liked_sentence = _join("Customers particularly liked: ", liked, ".")
+    doc = _join(doc, pc.if_else(pc.not_equal(liked, ""), liked_sentence, ""))
+    return pd.Series(pd.array(doc, dtype=pd.StringDtype('pyarrow')), index=df.index)
+
+def preprocess_dataframe(df):
+    # 1. Basic Cleaning
+    # Fill missing values
+    df['cuisines'] = df['cuisines'].fillna('Not Specified')
+    df['rest_type'] = df['rest_type'].fillna('Not Specified')
+    df['dish_liked'] = df['dish_liked'].fillna('')
+    df['location'] = df['location'].fillna('Unknown')
+    
+    # Normalize Ratings and Cost
+    df['rate_float'] = clean_rate_column(df['rate'])
+    df['approx_cost_two'] = clean_cost_column(df['approx_cost(for two people)'])
+    
+    # 2. Feature Engineering: Create Document String
+    print("Generating document strings for embeddings...")
+    df['document_string'] = build_document_strings(df)
+    return df
+
+def _normalized(series):
+    return series.fillna('').astype(str).str.lower().str.split().str.join(' ')
+
+def deduplicate_listings(df):
+    """Collapse the repeated per-section listings of a restaurant into one canonical record.
+
+    Rows are keyed on normalized name plus address (location when there is no address). The
+    canonical record is the most-voted listing, with every `listed_in(type)` / `listed_in(city)`
+    section merged into `listed_in_types` / `listed_in_cities`. Returns the deduplicated frame
+    and a mapping of canonical_row (position in the output) -> source_row (position in `df`).
+    """
+    df = df.reset_index(drop=True)
+    place = df['address'] if 'address' in df.columns else df['location']
+    place = place.where(place.notna() & (place.astype(object) != ''), df['location'])
+    key = _normalized(df['name']) + '|' + _normalized(place)
+    group = key.groupby(key, sort=False).ngroup()
+
+    # Canonical record: most votes first, ties broken by original order
+    order = np.arange(len(df))
+    if 'votes' in df.columns:
+        votes = pd.to_numeric(df['votes'], errors='coerce').fillna(-1).to_numpy()
+        order = np.lexsort((order, -votes))
+    ranked = pd.DataFrame({'group': group.to_numpy()[order], 'row': order})
+    canonical = ranked.drop_duplicates('group').sort_values('group')['row'].to_numpy()
+
+    deduped = df.iloc[canonical].reset_index(drop=True)
+    for source_col, merged_col in [('listed_in(type)', 'listed_in_types'), ('listed_in(city)', 'listed_in_cities')]:
+        if source_col in df.columns:
+            sections = pd.DataFrame({'group': group, 'value': df[source_col].fillna('').astype(str)})
+            sections = sections[sections['value'] != ''].drop_duplicates()
+            merged = sections.groupby('group', sort=True)['value'].agg(', '.join)
+            deduped[merged_col] = merged.reindex(np.arange(len(deduped)), fill_value='').to_numpy()
+
+    mapping = pd.DataFrame({'canonical_row': group.to_numpy(), 'source_row': np.arange(len(df))})
+    return deduped, mapping
+
+def load_and_preprocess_data(dataset_name="ManikaSaini/zomato-restaurant-recommendation", deduplicate=True):
     print(f"Loading dataset from Hugging Face: {dataset_name}...")
     try:
         # Load dataset
@@ -11,68 +162,21 @@ def load_and_preprocess_data(dataset_name="ManikaSaini/zomato-restaurant-recomme
         df = pd.DataFrame(dataset['train'])
         
         print("Data loaded. Starting preprocessing...")
-        
-        # 1. Basic Cleaning
-        # Fill missing values
-        df['cuisines'] = df['cuisines'].fillna('Not Specified')
-        df['rest_type'] = df['rest_type'].fillna('Not Specified')
-        df['dish_liked'] = df['dish_liked'].fillna('')
-        df['location'] = df['location'].fillna('Unknown')
-        
-        # Normalize Ratings
-        def clean_rate(rate):
-            if isinstance(rate, str):
-                if '/' in rate:
-                    rate = rate.split('/')[0].strip()
-                if rate == 'NEW' or rate == '-':
-                    return 0.0
-                try:
-                    return float(rate)
-                except:
-                    return 0.0
-            return float(rate) if rate else 0.0
-
-        df['rate_float'] = df['rate'].apply(clean_rate)
-        
-        # Normalize Cost
-        def clean_cost(cost):
-            if isinstance(cost, str):
-                cost = cost.replace(',', '').strip()
-                try:
-                    return int(cost)
-                except:
-                    return 0
-            return int(cost) if cost else 0
-
-        df['approx_cost_two'] = df['approx_cost(for two people)'].apply(clean_cost)
-        
-        # 2. Feature Engineering: Create Document String
-        def create_doc_string(row):
-            name = row.get('name', 'Unknown')
-            cuisines = row.get('cuisines', 'Various')
-            location = row.get('location', 'Unknown')
-            rate = row.get('rate_float', 0.0)
-            cost = row.get('approx_cost_two', 0)
-            rest_type = row.get('rest_type', 'Restaurant')
-            liked = row.get('dish_liked', '')
-            
-            doc = f"{name} is a {rest_type} specializing in {cuisines}, located in {location}. "
-            doc += f"It has a rating of {rate}/5.0. "
-            if cost > 0:
-                doc += f"The approximate cost for two people is ₹{cost}. "
-            if liked:
-                doc += f"Customers particularly liked: {liked}."
-            return doc
-
-        print("Generating document strings for embeddings...")
-        df['document_string'] = df.apply(create_doc_string, axis=1)
+        df = preprocess_dataframe(df)
         
         # 3. Create output directory if not exists
         os.makedirs('processed_data', exist_ok=True)
         
-        # Save as CSV
-        output_path = 'processed_data/restaurants_processed.csv'
-        df.to_csv(output_path, index=False)
+        # 4. One record per restaurant instead of one per listing section
+        if deduplicate:
+            raw_rows = len(df)
+            df, mapping = deduplicate_listings(df)
+            write_dedup_mapping(mapping)
+            print(f"Deduplicated {raw_rows} listings into {len(df)} restaurants")
+        
+        # Save as typed Parquet; readers decode only the columns they need
+        output_path = PROCESSED_PATH
+        write_processed(df, output_path)
         print(f"Preprocessing complete! Data saved to {output_path}")
         return df
 
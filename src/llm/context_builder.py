@@ -0,0 +1,98 @@
+import os
+import re
+
+from src.metrics import histogram
+
+CONTEXT_TOKENS = histogram('restaurant_context_tokens', "Estimated prompt tokens spent on restaurant context",
+                           buckets=(25, 50, 100, 200, 300, 400, 600, 800, 1200, 2000))
+CONTEXT_RESTAURANTS = histogram('restaurant_context_restaurants', "Restaurants included in the LLM context",
+                                buckets=(0, 1, 2, 3, 4, 5, 8, 10, 20))
+
+CONTEXT_HEADER = "# | name | cuisines | rating | cost for two | top dishes"
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Stores built before dish_liked was kept in the metadata still carry it in the document string
+_LIKED_PATTERN = re.compile(r"Customers particularly liked: (.*)\.\s*$")
+
+
+def estimate_tokens(text):
+    """Approximate BPE token count: one per word or symbol, plus one per extra 6 characters of long words."""
+    return sum(1 + (len(token) - 1) // 6 for token in _TOKEN_PATTERN.findall(str(text)))
+
+
+def _truncate(text, max_chars):
+    text = " ".join(str(text).split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rstrip(" ,") + "…"
+
+
+def _is_missing(value):
+    return value is None or value != value or value == ''
+
+
+class ContextBuilder:
+    """Packs retrieved restaurants into compact one-line rows that fit a prompt token budget.
+
+    Rows are added in retrieval order until the next one would overflow `token_budget`; the first
+    row is always kept. `max_tokens` for the completion then scales with the rows actually sent.
+    """
+
+    def __init__(self, token_budget=400, max_field_chars=60, top_dishes=3, base_max_tokens=150,
+                 tokens_per_restaurant=90, max_tokens_cap=1024, count_tokens=estimate_tokens):
+        self.token_budget = token_budget
+        self.max_field_chars = max_field_chars
+        self.top_dishes = top_dishes
+        self.base_max_tokens = base_max_tokens
+        self.tokens_per_restaurant = tokens_per_restaurant
+        self.max_tokens_cap = max_tokens_cap
+        self.count_tokens = count_tokens
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "400")),
+            top_dishes=int(os.getenv("CONTEXT_TOP_DISHES", "3")),
+            tokens_per_restaurant=int(os.getenv("CONTEXT_TOKENS_PER_RESTAURANT", "90")),
+        )
+
+    def _dishes(self, row):
+        liked = row.get('dish_liked')
+        if _is_missing(liked):
+            match = _LIKED_PATTERN.search(str(row.get('document_string', '')))
+            liked = match.group(1) if match else ''
+        dishes = [d.strip() for d in str(liked).split(',') if d.strip()][:self.top_dishes]
+        return _truncate(", ".join(dishes), self.max_field_chars) if dishes else "-"
+
+    def format_row(self, position, row):
+        rating = row.get('rate_float')
+        cost = row.get('approx_cost_two')
+        fields = [
+            str(position),
+            _truncate(row.get('name', ''), self.max_field_chars),
+            _truncate(row.get('cuisines', ''), self.max_field_chars),
+            # 0.0 is how preprocessing encodes unrated ("NEW") listings
+            f"{float(rating):.1f}/5" if not _is_missing(rating) and float(rating) > 0 else "new",
+            f"₹{int(cost)}" if not _is_missing(cost) and int(cost) > 0 else "-",
+            self._dishes(row),
+        ]
+        return " | ".join(fields)
+
+    def max_tokens_for(self, restaurants):
+        return min(self.max_tokens_cap, self.base_max_tokens + self.tokens_per_restaurant * restaurants)
+
+    def build(self, retrieved_results):
+        """Return (context, max_tokens, restaurants_included) for a DataFrame of ranked results."""
+        lines = [CONTEXT_HEADER]
+        used = self.count_tokens(CONTEXT_HEADER)
+        for position, row in enumerate(retrieved_results.to_dict('records'), start=1):
+            line = self.format_row(position, row)
+            cost = self.count_tokens(line)
+            if position > 1 and used + cost > self.token_budget:
+                break
+            lines.append(line)
+            used += cost
+
+        included = len(lines) - 1
+        CONTEXT_TOKENS.observe(used)
+        CONTEXT_RESTAURANTS.observe(included)
+        return "\n".join(lines) + "\n", self.max_tokens_for(included), included
@@ -0,0 +1,38 @@
+class LLMError(Exception):
+    """A failed LLM call. `status_code` is what the API answers with; `retry_after` is in seconds."""
+
+    status_code = 502
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMConfigurationError(LLMError):
+    """No API key (or similar setup problem); retrying won't help."""
+
+    status_code = 503
+
+
+class LLMRateLimitError(LLMError):
+    """Throttled by Groq, or our own RPM/TPM limiter couldn't admit the call before its deadline."""
+
+    status_code = 503
+
+
+class LLMTimeoutError(LLMError):
+    """The per-call deadline ran out."""
+
+    status_code = 504
+
+
+class LLMUnavailableError(LLMError):
+    """Groq returned 5xx or the connection failed, on every attempt."""
+
+    status_code = 502
+
+
+class LLMRequestError(LLMError):
+    """Groq rejected the request itself (4xx other than 429)."""
+
+    status_code = 502
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'lognormal')
+CANNED_WORDS = ("Here are my top picks for you. **Truffles** is a great choice for burgers at a fair price, "
+                "while **Dosa Corner** serves excellent masala dosa with quick service and strong ratings.").split()
+
+
+class FakeGroqSettings:
+    """Behaviour knobs for the fake chat-completions server."""
+
+    def __init__(self, latency_ms=300.0, latency_dist='lognormal', latency_sigma=0.5, tokens_per_s=400.0,
+                 completion_tokens=150, rate_429=0.0, rate_5xx=0.0, retry_after_s=1, seed=None):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency_dist {latency_dist!r}; expected one of {LATENCY_DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_s = tokens_per_s
+        self.completion_tokens = completion_tokens
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.retry_after_s = retry_after_s
+        self.rng = random.Random(seed)
+
+    def first_token_delay(self):
+        # Time to first token; `latency_ms` is the median for every distribution
+        if self.latency_dist == 'fixed':
+            ms = self.latency_ms
+        elif self.latency_dist == 'uniform':
+            ms = self.rng.uniform(0, 2 * self.latency_ms)
+        else:
+            ms = self.latency_ms * self.rng.lognormvariate(0, self.latency_sigma)
+        return ms / 1000
+
+    def injected_error(self):
+        roll = self.rng.random()
+        if roll < self.rate_429:
+            return 429
+        if roll < self.rate_429 + self.rate_5xx:
+            return self.rng.choice((500, 502, 503))
+        return None
+
+
+def _error_response(status, settings):
+    if status == 429:
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": str(settings.retry_after_s)},
+            content={"error": {"message": "Rate limit reached for model (fake)", "type": "tokens",
+                               "code": "rate_limit_exceeded"}},
+        )
+    return JSONResponse(status_code=status,
+                        content={"error": {"message": "Service unavailable (fake)", "type": "internal_server_error"}})
+
+
+def _completion_tokens(settings, max_tokens):
+    count = min(settings.completion_tokens, max_tokens or settings.completion_tokens)
+    return [CANNED_WORDS[i % len(CANNED_WORDS)] + " " for i in range(count)]
+
+
+def create_fake_groq_app(settings=None):
+    """An OpenAI-compatible /openai/v1/chat/completions endpoint that mimics Groq's timing and failures."""
+    app = FastAPI(title="Fake Groq")
+    app.state.settings = settings or FakeGroqSettings()
+    app.state.counts = {'requests': 0, '429': 0, '5xx': 0, 'ok': 0}
+
+    @app.get("/stats")
+    def stats():
+        return app.state.counts
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        settings = app.state.settings
+        counts = app.state.counts
+        body = await request.json()
+        counts['requests'] += 1
+
+        error = settings.injected_error()
+        if error is not None:
+            counts['429' if error == 429 else '5xx'] += 1
+            return _error_response(error, settings)
+
+        tokens = _completion_tokens(settings, body.get('max_tokens'))
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in body.get('messages', [])) // 4
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                 'total_tokens': prompt_tokens + len(tokens)}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get('model', 'llama-3.1-8b-instant')
+        counts['ok'] += 1
+
+        if not body.get('stream'):
+            await asyncio.sleep(settings.first_token_delay() + len(tokens) / settings.tokens_per_s)
+            return {
+                'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': "".join(tokens)},
+                             'finish_reason': 'stop'}],
+                'usage': usage,
+            }
+
+        async def events():
+            def chunk(delta, finish_reason=None):
+                payload = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                           'model': model,
+                           'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+                if finish_reason:
+                    # Like Groq, usage arrives on the final chunk under x_groq
+                    payload['x_groq'] = {'id': completion_id, 'usage': usage}
+                return f"data: {json.dumps(payload)}\n\n"
+
+            await asyncio.sleep(settings.first_token_delay())
+            yield chunk({'role': 'assistant', 'content': ''})
+            for token in tokens:
+                yield chunk({'content': token})
+                await asyncio.sleep(1 / settings.tokens_per_s)
+            yield chunk({}, finish_reason='stop')
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the Groq chat-completions API")
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency-ms', type=float, default=300.0, help="Median time to first token")
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help="Lognormal spread")
+    parser.add_argument('--tokens-per-s', type=float, default=400.0)
+    parser.add_argument('--completion-tokens', type=int, default=150)
+    parser.add_argument('--rate-429', type=float, default=0.0, help="Fraction of requests rejected with 429")
+    parser.add_argument('--rate-5xx', type=float, default=0.0, help="Fraction of requests failed with 5xx")
+    parser.add_argument('--retry-after-s', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    settings = FakeGroqSettings(latency_ms=args.latency_ms, latency_dist=args.latency_dist,
+                                latency_sigma=args.latency_sigma, tokens_per_s=args.tokens_per_s,
+                                completion_tokens=args.completion_tokens, rate_429=args.rate_429,
+                                rate_5xx=args.rate_5xx, retry_after_s=args.retry_after_s, seed=args.seed)
+    print(f"Fake Groq listening on http://127.0.0.1:{args.port} (set GROQ_BASE_URL to use it)")
+    uvicorn.run(create_fake_groq_app(settings), host="127.0.0.1", port=args.port, log_level="warning")
@@ -1,22 +1,90 @@
+import asyncio
 import os
-from groq import Groq
+from functools import partial
+import httpx
+from groq import Groq, AsyncGroq, DefaultHttpxClient, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
+from src.llm.context_builder import estimate_tokens
+from src.llm.errors import LLMConfigurationError, LLMError
+from src.llm.resilience import ResilientCaller, classify
+from src.llm.response_cache import ResponseCache, make_cache_key
+from src.llm.single_flight import SingleFlight
+from src.metrics import counter, timed
+
 load_dotenv()
 
+LLM_CACHE_LOOKUPS = counter('restaurant_llm_cache_lookups', "LLM response cache lookups", ['result'])
+LLM_REQUESTS = counter('restaurant_llm_requests', "Groq API calls by outcome", ['outcome'])
+LLM_TOKENS = counter('restaurant_llm_tokens', "Prompt and completion tokens reported by Groq", ['kind'])
+
+def _record_usage(usage):
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, kind='prompt')
+    LLM_TOKENS.inc(usage.completion_tokens or 0, kind='completion')
+
+def _request_tokens(kwargs):
+    # What the call counts against the TPM quota: prompt plus the completion it may produce
+    return sum(estimate_tokens(m['content']) for m in kwargs['messages']) + kwargs['max_tokens']
+
+def _unused_tokens(reserved, usage):
+    total = getattr(usage, 'total_tokens', None)
+    return reserved - total if isinstance(total, int) else 0
+
+def _unsettled_tokens(kwargs, parts):
+    # No usage reported (server omits it, stream failed or was abandoned): keep an estimate of
+    # the completion streamed so far and give back the rest of the max_tokens reservation
+    return max(0, kwargs['max_tokens'] - estimate_tokens("".join(parts)))
+
+def _pool_limits():
+    # Keep-alive connections are reused across requests, saving a TCP + TLS handshake per call
+    size = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))
+    return httpx.Limits(max_connections=size, max_keepalive_connections=size, keepalive_expiry=60)
+
+def _chunk_usage(chunk):
+    # Groq reports usage on the final stream chunk under x_groq; OpenAI-style servers use .usage
+    x_groq = getattr(chunk, 'x_groq', None)
+    return getattr(x_groq, 'usage', None) or getattr(chunk, 'usage', None)
+
 class GroqService:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache=None, base_url=None, http_client=None, async_http_client=None,
+                 coalesce=True, caller=None):
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        # GROQ_BASE_URL points the service at another endpoint, e.g. the local fake for load tests
+        self.base_url = base_url or os.getenv("GROQ_BASE_URL") or None
         if not self.api_key:
             # We'll allow initialization without key for structure, 
             # but methods will fail if key is missing when called.
             pass
-        self.client = Groq(api_key=self.api_key) if self.api_key else None
+        # One pooled client per service for its whole lifetime. SDK retries are off: the caller
+        # below owns retries, backoff and deadlines
+        self.client = Groq(api_key=self.api_key, base_url=self.base_url, max_retries=0,
+                           http_client=http_client or DefaultHttpxClient(limits=_pool_limits())
+                           ) if self.api_key else None
+        # Non-blocking client for the async serving path; shares the same key and settings
+        self.async_client = AsyncGroq(api_key=self.api_key, base_url=self.base_url, max_retries=0,
+                                      http_client=async_http_client or DefaultAsyncHttpxClient(limits=_pool_limits())
+                                      ) if self.api_key else None
+        # Successful completions only; failures raise and are never stored
+        self.cache = cache if cache is not None else ResponseCache.from_env()
+        # Identical prompts already in flight share one Groq call instead of each issuing their own
+        self.inflight = SingleFlight('llm') if coalesce else None
+        # RPM/TPM limiter, retries with backoff, per-call deadline and optional hedging
+        self.caller = caller or ResilientCaller.from_env()
 
-    def generate_recommendation(self, user_query, restaurants_context):
-        if not self.client:
-            return "Error: GROQ_API_KEY not found in environment. Please set it in a .env file."
+    def close(self):
+        if self.client:
+            self.client.close()
+        self.cache.close()
+
+    async def aclose(self):
+        # Releases both connection pools; the service can't be used afterwards
+        self.close()
+        if self.async_client:
+            await self.async_client.close()
 
+    def _build_messages(self, user_query, restaurants_context):
         system_prompt = """
         You are an expert local food guide for Zomato. Your goal is to provide clear, helpful, 
         and conversational restaurant recommendations based ONLY on the context provided.
@@ -40,16 +108,185 @@ class GroqService:
         Please provide your recommendations:
         """
 
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _completion_kwargs(self, user_query, restaurants_context, stream=False, max_tokens=None):
+        kwargs = dict(
+            model="llama-3.1-8b-instant", # Current supported Groq model
+            messages=self._build_messages(user_query, restaurants_context),
+            temperature=0.7,
+            max_tokens=max_tokens or 1024
+        )
+        if stream:
+            kwargs["stream"] = True
+        return kwargs
+
+    def _cache_get(self, cache_key):
+        cached = self.cache.get(cache_key)
+        LLM_CACHE_LOOKUPS.inc(result='miss' if cached is None else 'hit')
+        return cached
+
+    def _settle(self, reserved, usage):
+        _record_usage(usage)
+        self.caller.refund(_unused_tokens(reserved, usage))
+
+    def generate_recommendation(self, user_query, restaurants_context, max_tokens=None):
+        if not self.client:
+            raise LLMConfigurationError("GROQ_API_KEY not found in environment. Please set it in a .env file.")
+
+        kwargs = self._completion_kwargs(user_query, restaurants_context, max_tokens=max_tokens)
+        cache_key = make_cache_key(kwargs)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Timed per caller, so a coalesced request's llm stage is the time it waited
+        with timed('llm'):
+            if self.inflight is None:
+                return self._complete(kwargs, cache_key)
+            return self.inflight.do(cache_key, partial(self._complete, kwargs, cache_key))
+
+    def _complete(self, kwargs, cache_key):
+        tokens = _request_tokens(kwargs)
+        try:
+            completion = self.caller.call(
+                lambda timeout: self.client.chat.completions.create(timeout=timeout, **kwargs), tokens)
+        except LLMError:
+            LLM_REQUESTS.inc(outcome='error')
+            raise
+        content = completion.choices[0].message.content
+        LLM_REQUESTS.inc(outcome='ok')
+        self._settle(tokens, getattr(completion, 'usage', None))
+        self.cache.set(cache_key, content)
+        return content
+
+    async def agenerate_recommendation(self, user_query, restaurants_context, max_tokens=None):
+        # Same contract as generate_recommendation, but awaits the HTTP round trip instead of
+        # holding a thread for it
+        if not self.async_client:
+            raise LLMConfigurationError("GROQ_API_KEY not found in environment. Please set it in a .env file.")
+
+        kwargs = self._completion_kwargs(user_query, restaurants_context, max_tokens=max_tokens)
+        cache_key = make_cache_key(kwargs)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        with timed('llm'):
+            if self.inflight is None:
+                return await self._acomplete(kwargs, cache_key)
+            return await self.inflight.ado(cache_key, partial(self._acomplete, kwargs, cache_key))
+
+    async def _acomplete(self, kwargs, cache_key):
+        tokens = _request_tokens(kwargs)
         try:
-            completion = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant", # Current supported Groq model
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1024
-            )
-            return completion.choices[0].message.content
-        except Exception as e:
-            return f"An error occurred while calling Groq: {str(e)}"
+            completion = await self.caller.acall(
+                lambda timeout: self.async_client.chat.completions.create(timeout=timeout, **kwargs), tokens)
+        except LLMError:
+            LLM_REQUESTS.inc(outcome='error')
+            raise
+        content = completion.choices[0].message.content
+        LLM_REQUESTS.inc(outcome='ok')
+        self._settle(tokens, getattr(completion, 'usage', None))
+        self.cache.set(cache_key, content)
+        return content
+
+    def stream_recommendation(self, user_query, restaurants_context, max_tokens=None):
+        # Yields text deltas as Groq produces them. Opening the stream is retried like any call;
+        # once tokens have been sent a failure is raised as-is
+        if not self.client:
+            raise LLMConfigurationError("GROQ_API_KEY not found in environment. Please set it in a .env file.")
+
+        kwargs = self._completion_kwargs(user_query, restaurants_context, stream=True, max_tokens=max_tokens)
+        cache_key = make_cache_key(kwargs)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        tokens = _request_tokens(kwargs)
+        parts = []
+        with timed('llm'):
+            try:
+                stream = self.caller.call(
+                    lambda timeout: self.client.chat.completions.create(timeout=timeout, **kwargs), tokens)
+            except LLMError:
+                LLM_REQUESTS.inc(outcome='error')
+                raise
+            settled, outcome = False, 'error'
+            try:
+                for chunk in stream:
+                    usage = _chunk_usage(chunk)
+                    if usage is not None:
+                        self._settle(tokens, usage)
+                        settled = True
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                outcome = 'ok'
+            except GeneratorExit:
+                # The consumer stopped early, e.g. the client disconnected
+                outcome = 'cancelled'
+                raise
+            except Exception as e:
+                raise classify(e)[0] from e
+            finally:
+                close = getattr(stream, 'close', None)
+                if close is not None:
+                    close()
+                if not settled:
+                    self.caller.refund(_unsettled_tokens(kwargs, parts))
+                LLM_REQUESTS.inc(outcome=outcome)
+        self.cache.set(cache_key, "".join(parts))
+
+    async def astream_recommendation(self, user_query, restaurants_context, max_tokens=None):
+        if not self.async_client:
+            raise LLMConfigurationError("GROQ_API_KEY not found in environment. Please set it in a .env file.")
+
+        kwargs = self._completion_kwargs(user_query, restaurants_context, stream=True, max_tokens=max_tokens)
+        cache_key = make_cache_key(kwargs)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        tokens = _request_tokens(kwargs)
+        parts = []
+        with timed('llm'):
+            try:
+                stream = await self.caller.acall(
+                    lambda timeout: self.async_client.chat.completions.create(timeout=timeout, **kwargs), tokens,
+                    hedge=False)
+            except LLMError:
+                LLM_REQUESTS.inc(outcome='error')
+                raise
+            settled, outcome = False, 'error'
+            try:
+                async for chunk in stream:
+                    usage = _chunk_usage(chunk)
+                    if usage is not None:
+                        self._settle(tokens, usage)
+                        settled = True
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                outcome = 'ok'
+            except (GeneratorExit, asyncio.CancelledError):
+                outcome = 'cancelled'
+                raise
+            except Exception as e:
+                raise classify(e)[0] from e
+            finally:
+                # Groq's AsyncStream closes with close(), a plain async generator with aclose()
+                close = getattr(stream, 'aclose', None) or getattr(stream, 'close', None)
+                if close is not None:
+                    await close()
+                if not settled:
+                    self.caller.refund(_unsettled_tokens(kwargs, parts))
+                LLM_REQUESTS.inc(outcome=outcome)
+        self.cache.set(cache_key, "".join(parts))
@@ -1,34 +1,127 @@
 import os
 import sys
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.vector_db.search import RestaurantSearch
+from src.vector_db.rerank import CrossEncoderReranker
 from src.llm.groq_client import GroqService
+from src.llm.context_builder import ContextBuilder
+from src.metrics import timed
+
+NO_RESULTS_MESSAGE = "I couldn't find any restaurants matching your specific criteria. Try adjusting your filters!"
 
 class RecommendationEngine:
-    def __init__(self):
-        self.searcher = RestaurantSearch()
+    def __init__(self, vector_store_path='vector_store', mmap=False, retrieval_workers=None, reranker=None,
+                 context_builder=None):
+        self.searcher = RestaurantSearch(vector_store_path=vector_store_path, mmap=mmap)
         self.llm = GroqService()
+        # Compact, token-budgeted rows keep prompt size (and time to first token) predictable
+        self.context_builder = context_builder or ContextBuilder.from_env()
+        # Optional cross-encoder stage: retrieve more candidates, send fewer, better ones to the LLM
+        self.reranker = reranker if reranker is not None else CrossEncoderReranker.from_env()
+        # CPU-bound retrieval (encode + FAISS) runs here on the async path so the event loop
+        # stays free to multiplex in-flight LLM calls
+        self.retrieval_executor = ThreadPoolExecutor(max_workers=retrieval_workers or os.cpu_count(),
+                                                     thread_name_prefix="retrieval")
+
+    async def aclose(self):
+        # Called on API shutdown: stop the retrieval threads and release pooled Groq connections
+        self.retrieval_executor.shutdown(wait=False)
+        # Benchmarks and tests swap in stand-in LLMs that hold no connections
+        aclose = getattr(self.llm, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+
+    def retrieve(self, query, location=None, max_price=None, min_rating=0.0):
+        return self._retrieve(query, location=location, max_price=max_price, min_rating=min_rating)
+
+    def _retrieve(self, query, location=None, max_price=None, min_rating=0.0):
+        if self.reranker is None:
+            return self.searcher.search(query, top_k=5, location=location, max_price=max_price, min_rating=min_rating)
+        candidates = self.searcher.search(query, top_k=self.reranker.max_candidates, location=location,
+                                          max_price=max_price, min_rating=min_rating)
+        with timed('rerank'):
+            return self.reranker.rerank(query, candidates)
+
+    def warm_up(self, query="spicy North Indian food"):
+        # The first encode + search pays for lazy model init, kernel selection and index page
+        # faults; doing it at startup keeps that cost off the first real request
+        self._retrieve(query)
+        self._retrieve(query, location=self.searcher.locations[0] if self.searcher.locations else None)
+
+    def _build_context(self, retrieved_results):
+        # (context, max_tokens) for the LLM call
+        with timed('context'):
+            context, max_tokens, _ = self.context_builder.build(retrieved_results)
+            return context, max_tokens
+
+    def _run_retrieval(self, query, location, max_price, min_rating):
+        # copy_context() carries the request's timing collector into the executor thread
+        return asyncio.get_running_loop().run_in_executor(
+            self.retrieval_executor,
+            contextvars.copy_context().run,
+            partial(self._retrieve, query, location=location, max_price=max_price, min_rating=min_rating)
+        )
 
     def get_recommendations(self, query, location=None, max_price=None, min_rating=0.0):
         # 1. Retrieve relevant restaurants from Vector DB (FAISS)
-        retrieved_results = self.searcher.search(query, top_k=5, location=location, max_price=max_price, min_rating=min_rating)
+        retrieved_results = self._retrieve(query, location=location, max_price=max_price, min_rating=min_rating)
         
         if retrieved_results.empty:
-            return "I couldn't find any restaurants matching your specific criteria. Try adjusting your filters!"
+            return NO_RESULTS_MESSAGE
 
         # 2. Format context for LLM
-        context = ""
-        for i, (_, row) in enumerate(retrieved_results.iterrows()):
-            context += f"{i+1}. {row['document_string']}\n"
+        context, max_tokens = self._build_context(retrieved_results)
 
         # 3. Get synthesis from Groq LLM
-        recommendation = self.llm.generate_recommendation(query, context)
+        recommendation = self.llm.generate_recommendation(query, context, max_tokens=max_tokens)
         
         return recommendation
 
+    async def aget_recommendations(self, query, location=None, max_price=None, min_rating=0.0):
+        # 1. Retrieve in the dedicated executor, off the event loop
+        retrieved_results = await self._run_retrieval(query, location, max_price, min_rating)
+        
+        if retrieved_results.empty:
+            return NO_RESULTS_MESSAGE
+
+        # 2. Format context for LLM
+        context, max_tokens = self._build_context(retrieved_results)
+
+        # 3. Await the Groq completion without blocking a worker thread
+        return await self.llm.agenerate_recommendation(query, context, max_tokens=max_tokens)
+
+    def stream_recommendations(self, query, location=None, max_price=None, min_rating=0.0):
+        # Same flow as get_recommendations, yielding the LLM answer token by token
+        retrieved_results = self._retrieve(query, location=location, max_price=max_price, min_rating=min_rating)
+        yield from self.stream_answer(query, retrieved_results)
+
+    def stream_answer(self, query, retrieved_results):
+        # LLM half of stream_recommendations, for callers (the UI) that run retrieval themselves
+        if retrieved_results.empty:
+            yield NO_RESULTS_MESSAGE
+            return
+
+        context, max_tokens = self._build_context(retrieved_results)
+        yield from self.llm.stream_recommendation(query, context, max_tokens=max_tokens)
+
+    async def astream_recommendations(self, query, location=None, max_price=None, min_rating=0.0):
+        retrieved_results = await self._run_retrieval(query, location, max_price, min_rating)
+        
+        if retrieved_results.empty:
+            yield NO_RESULTS_MESSAGE
+            return
+
+        context, max_tokens = self._build_context(retrieved_results)
+        async for token in self.llm.astream_recommendation(query, context, max_tokens=max_tokens):
+            yield token
+
 if __name__ == "__main__":
     # Test run
     engine = RecommendationEngine()
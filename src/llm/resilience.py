@@ -0,0 +1,347 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import groq
+import httpx
+import numpy as np
+
+from src.llm.errors import (LLMError, LLMRateLimitError, LLMRequestError, LLMTimeoutError,
+                            LLMUnavailableError)
+from src.metrics import counter, histogram
+
+LLM_RETRIES = counter('restaurant_llm_retries', "Groq calls retried, by the error that caused it", ['reason'])
+LLM_HEDGES = counter('restaurant_llm_hedges', "Hedged duplicate Groq calls launched")
+LLM_THROTTLE_SECONDS = histogram('restaurant_llm_throttle_wait_seconds',
+                                 "Time calls waited on the local RPM/TPM limiter")
+
+
+class TokenBucket:
+    """Refills at `per_minute / 60` units per second up to `burst`; callers reserve ahead of time.
+
+    A reservation is deducted immediately (the balance may go negative) and returns how long the
+    caller must wait, so sync and async callers can sleep in their own way.
+    """
+
+    def __init__(self, per_minute, burst=None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or per_minute)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        self._refill()
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def credit(self, amount):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Client-side requests-per-minute and tokens-per-minute limits, sized to the Groq quota."""
+
+    def __init__(self, rpm=None, tpm=None, clock=time.monotonic):
+        self.requests = TokenBucket(rpm, clock=clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock=clock) if tpm else None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        rpm = int(os.getenv("GROQ_RPM_LIMIT", "0"))
+        tpm = int(os.getenv("GROQ_TPM_LIMIT", "0"))
+        return cls(rpm=rpm, tpm=tpm) if rpm or tpm else None
+
+    def reserve(self, tokens, max_wait):
+        """Seconds to wait before sending; raises LLMRateLimitError if that exceeds `max_wait`."""
+        with self._lock:
+            waits = [0.0]
+            if self.requests:
+                waits.append(self.requests.wait_time(1))
+            if self.tokens:
+                waits.append(self.tokens.wait_time(tokens))
+            delay = max(waits)
+            if delay > max_wait:
+                raise LLMRateLimitError(f"Local Groq quota exhausted; next slot in {delay:.1f}s", retry_after=delay)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            return delay
+
+    def refund(self, tokens, requests=0):
+        """Give back part of a reservation: unused or never-spent tokens, and requests never sent."""
+        with self._lock:
+            if self.tokens and tokens > 0:
+                self.tokens.credit(tokens)
+            if self.requests and requests > 0:
+                self.requests.credit(requests)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter; a Retry-After from Groq sets the floor."""
+
+    def __init__(self, max_attempts=3, base_delay=0.25, max_delay=8.0, rng=None):
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            # Jitter on top, so throttled callers don't all come back in the same instant
+            return retry_after + self.rng.uniform(0, self.base_delay)
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies, used to pick the hedging delay."""
+
+    def __init__(self, window=200, min_samples=20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def quantile(self, q):
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            return float(np.quantile(np.fromiter(self.samples, dtype='float64'), q))
+
+
+def _retry_after(response):
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        # HTTP-date form; fall back to our own backoff
+        pass
+    return None
+
+
+def classify(error):
+    """Map a Groq SDK (or other) exception to (typed LLMError, retryable)."""
+    if isinstance(error, LLMError):
+        return error, False
+    message = f"An error occurred while calling Groq: {error}"
+    if isinstance(error, groq.APITimeoutError):
+        return LLMTimeoutError(message), True
+    if isinstance(error, groq.APIConnectionError):
+        return LLMUnavailableError(message), True
+    # Raw httpx errors surface while iterating a stream, outside the SDK's own wrapping
+    if isinstance(error, httpx.TimeoutException):
+        return LLMTimeoutError(message), True
+    if isinstance(error, httpx.TransportError):
+        return LLMUnavailableError(message), True
+    if isinstance(error, groq.RateLimitError):
+        return LLMRateLimitError(message, retry_after=_retry_after(error.response)), True
+    if isinstance(error, groq.APIStatusError):
+        if error.status_code >= 500:
+            return LLMUnavailableError(message), True
+        return LLMRequestError(message), False
+    return LLMError(message), False
+
+
+class ResilientCaller:
+    """Wraps a Groq call with the local rate limiter, retries, a deadline and, when async, hedging.
+
+    `fn(timeout)` performs one attempt with the given timeout in seconds. Each attempt reserves one
+    request and `tokens` from the limiter; a request that is never sent gives both back, and one
+    that fails or loses a hedge gives back its tokens. The winning attempt keeps its tokens until
+    the caller settles actual usage with `refund`.
+
+    Hedging sends a second, identical request when the first hasn't answered within `hedge_after_s`
+    (or the rolling `hedge_quantile` latency) and takes whichever finishes first; it only fires when
+    the limiter has spare quota, so it never adds to throttling. Only `acall` hedges: the loser is
+    cancelled, which a blocking sync call can't be.
+    """
+
+    def __init__(self, limiter=None, retry=None, deadline_s=20.0, hedge_after_s=None, hedge_quantile=None,
+                 clock=time.monotonic, sleep=time.sleep, asleep=asyncio.sleep):
+        self.limiter = limiter
+        self.retry = retry or RetryPolicy()
+        self.deadline_s = deadline_s
+        self.hedge_after_s = hedge_after_s
+        self.hedge_quantile = hedge_quantile
+        self.latency = LatencyTracker()
+        self.clock = clock
+        self.sleep = sleep
+        self.asleep = asleep
+
+    @classmethod
+    def from_env(cls):
+        hedge_ms = os.getenv("GROQ_HEDGE_AFTER_MS")
+        hedge_quantile = os.getenv("GROQ_HEDGE_QUANTILE")
+        return cls(
+            limiter=RateLimiter.from_env(),
+            retry=RetryPolicy(max_attempts=int(os.getenv("GROQ_MAX_ATTEMPTS", "3"))),
+            deadline_s=float(os.getenv("GROQ_DEADLINE_S", "20")),
+            hedge_after_s=float(hedge_ms) / 1000 if hedge_ms else None,
+            hedge_quantile=float(hedge_quantile) if hedge_quantile else None,
+        )
+
+    def hedge_delay(self):
+        if self.hedge_after_s is not None:
+            return self.hedge_after_s
+        if self.hedge_quantile is not None:
+            return self.latency.quantile(self.hedge_quantile)
+        return None
+
+    def refund(self, tokens, requests=0):
+        if self.limiter is not None:
+            self.limiter.refund(tokens, requests)
+
+    def _admit(self, tokens, deadline):
+        if self.limiter is None:
+            return 0.0
+        delay = self.limiter.reserve(tokens, max_wait=deadline - self.clock())
+        LLM_THROTTLE_SECONDS.observe(delay)
+        return delay
+
+    def _can_hedge(self, tokens):
+        try:
+            return self.limiter is None or self.limiter.reserve(tokens, max_wait=0) == 0
+        except LLMRateLimitError:
+            return False
+
+    def _next_delay(self, attempt, error, deadline):
+        # None means give up: not retryable, out of attempts, or the wait would pass the deadline
+        error, retryable = classify(error)
+        if not retryable or attempt + 1 >= self.retry.max_attempts:
+            return error, None
+        delay = self.retry.backoff(attempt, error.retry_after)
+        if self.clock() + delay >= deadline:
+            return error, None
+        LLM_RETRIES.inc(reason=type(error).__name__)
+        return error, delay
+
+    def call(self, fn, tokens=0):
+        deadline = self.clock() + self.deadline_s
+        error = None
+        for attempt in range(self.retry.max_attempts):
+            delay = self._admit(tokens, deadline)
+            if delay:
+                self.sleep(delay)
+            try:
+                return self._attempt(fn, tokens, deadline)
+            except Exception as e:
+                error, delay = self._next_delay(attempt, e, deadline)
+                if delay is None:
+                    if error is e:
+                        raise
+                    raise error from e
+                self.sleep(delay)
+        raise error
+
+    async def acall(self, fn, tokens=0, hedge=True):
+        deadline = self.clock() + self.deadline_s
+        error = None
+        for attempt in range(self.retry.max_attempts):
+            delay = self._admit(tokens, deadline)
+            if delay:
+                await self.asleep(delay)
+            try:
+                return await self._aattempt(fn, tokens, deadline, hedge)
+            except Exception as e:
+                error, delay = self._next_delay(attempt, e, deadline)
+                if delay is None:
+                    if error is e:
+                        raise
+                    raise error from e
+                await self.asleep(delay)
+        raise error
+
+    def _remaining(self, deadline):
+        remaining = deadline - self.clock()
+        if remaining <= 0:
+            raise LLMTimeoutError(f"Groq call exceeded its {self.deadline_s:.1f}s deadline")
+        return remaining
+
+    def _send_timeout(self, tokens, deadline):
+        # The deadline can pass while throttled; the reserved request then never goes out
+        try:
+            return self._remaining(deadline)
+        except LLMTimeoutError:
+            self.refund(tokens, requests=1)
+            raise
+
+    def _attempt(self, fn, tokens, deadline):
+        timeout = self._send_timeout(tokens, deadline)
+        start = self.clock()
+        try:
+            result = fn(timeout)
+        except BaseException:
+            self.refund(tokens)
+            raise
+        self.latency.record(self.clock() - start)
+        return result
+
+    async def _aattempt(self, fn, tokens, deadline, hedge):
+        timeout = self._send_timeout(tokens, deadline)
+        start = self.clock()
+        hedge_after = self.hedge_delay() if hedge else None
+        if hedge_after is None:
+            try:
+                result = await asyncio.wait_for(fn(timeout), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.refund(tokens)
+                raise LLMTimeoutError(f"Groq call exceeded its {self.deadline_s:.1f}s deadline")
+            except BaseException:
+                self.refund(tokens)
+                raise
+            self.latency.record(self.clock() - start)
+            return result
+
+        sent = [asyncio.ensure_future(fn(timeout))]
+        winner = None
+        try:
+            done, pending = await asyncio.wait(sent, timeout=hedge_after)
+            if not done and self._can_hedge(tokens):
+                LLM_HEDGES.inc()
+                sent.append(asyncio.ensure_future(fn(self._send_timeout(tokens, deadline))))
+                pending.add(sent[-1])
+            error = None
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        self.latency.record(self.clock() - start)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=self._remaining(deadline),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise LLMTimeoutError(f"Groq call exceeded its {self.deadline_s:.1f}s deadline")
+            raise error
+        finally:
+            # The slower duplicate is cancelled, which closes its connection. Every request but
+            # the winner has its tokens returned
+            for task in sent:
+                if task is not winner:
+                    task.cancel()
+                    self.refund(tokens)
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.cache import LRUCache
+
+
+def make_cache_key(completion_kwargs):
+    # Everything that shapes the completion (model, system prompt, user query + context,
+    # sampling settings) goes into the key; the stream flag does not change the answer
+    payload = {k: v for k, v in completion_kwargs.items() if k != "stream"}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class DiskCacheBackend:
+    """SQLite-backed store so cached recommendations survive restarts and are shared by workers.
+
+    One connection per instance, shared by threads under `_lock`. Hits refresh `accessed_at` at
+    most every `touch_interval` seconds: LRU eviction only needs coarse recency, and it keeps
+    most reads from writing.
+    """
+
+    def __init__(self, path, max_size=10000, ttl=None, clock=time.time, touch_interval=60.0):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        now = self.clock()
+        # The connection's context manager commits (or rolls back) the transaction
+        with self._lock, self._conn as conn:
+            row = conn.execute("SELECT value, expires_at, accessed_at FROM responses WHERE key = ?",
+                               (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            if now - accessed_at >= self.touch_interval:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key, value):
+        now = self.clock()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock, self._conn as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            # Size bound: drop expired rows, then the least recently used beyond max_size
+            conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """In-memory LRU in front of an optional on-disk backend, for successful LLM completions only."""
+
+    def __init__(self, max_size=512, ttl=3600, disk_path=None, disk_max_size=10000):
+        self.memory = LRUCache(max_size=max_size, ttl=ttl)
+        self.disk = DiskCacheBackend(disk_path, max_size=disk_max_size, ttl=ttl) if disk_path else None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+            disk_path=os.getenv("RESPONSE_CACHE_PATH") or None,
+        )
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        if not value:
+            return
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self):
+        return self.memory.stats()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
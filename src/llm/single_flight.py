@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+from src.metrics import counter
+
+COALESCED = counter('restaurant_coalesced_requests', "Calls that joined an identical in-flight call", ['name'])
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key: one caller does the work, the rest wait for it.
+
+    Only calls that overlap in time are merged; nothing is kept once the leading call finishes,
+    so this complements the response cache rather than replacing it.
+    """
+
+    def __init__(self, name='llm'):
+        self.name = name
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run `fn()` for `key` unless another thread already is; either way return its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            COALESCED.inc(name=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key, coro_fn):
+        """Async counterpart of `do`: awaits `coro_fn()` once per key across concurrent tasks."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._tasks.get(key)
+            # A task left by another event loop can't be awaited from this one
+            leader = task is None or task.get_loop() is not loop
+            if leader:
+                task = loop.create_task(coro_fn())
+                self._tasks[key] = task
+                task.add_done_callback(lambda _: self._forget(key, task))
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            COALESCED.inc(name=self.name)
+        # shield(): a caller that is cancelled (e.g. client disconnect) must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def stats(self):
+        with self._lock:
+            return {'leaders': self.leaders, 'coalesced': self.coalesced,
+                    'in_flight': len(self._calls) + len(self._tasks)}
@@ -9,6 +9,7 @@ from PIL import Image
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.llm.recommender import RecommendationEngine
+from src.llm.errors import LLMError
 
 # Load environment variables
 load_dotenv()
@@ -102,11 +103,10 @@ st.markdown("""
 # Initialize Engine
 @st.cache_resource
 def get_engine():
-    return RecommendationEngine()
+    return RecommendationEngine(mmap=True)
 
 try:
     engine = get_engine()
-    metadata = pd.read_pickle('vector_store/metadata.pkl')
 except Exception as e:
     st.error(f"Initialization Error: {e}")
     st.stop()
@@ -119,7 +119,7 @@ with st.sidebar:
     
     st.divider()
     
-    location_options = ["Any"] + sorted(metadata['location'].dropna().unique().tolist())
+    location_options = ["Any"] + engine.searcher.locations
     place = st.selectbox("🌍 Select Location", options=location_options, index=0)
     
     max_price = st.slider("💰 Max Budget (for two)", 200, 5000, 1500, step=100)
@@ -154,19 +154,23 @@ if search_clicked:
     if not query:
         st.warning("Please tell us what you're craving first!")
     else:
-        with st.spinner("Searching the city for the best matches..."):
-            loc_filter = None if place == "Any" else place
-            
-            recommendation = engine.get_recommendations(
-                query=query,
-                location=loc_filter,
-                max_price=max_price,
-                min_rating=min_rating
-            )
+        loc_filter = None if place == "Any" else place
         
         st.markdown('<div class="recommendation-container">', unsafe_allow_html=True)
         st.subheader("🍽️ Our Handpicked Suggestions")
-        st.markdown(recommendation)
+        # Retrieval (encode, search, rerank) happens behind the spinner; the LLM answer is then
+        # rendered token by token as Groq produces it
+        try:
+            with st.spinner("Searching the city for the best matches..."):
+                results = engine.retrieve(
+                    query=query,
+                    location=loc_filter,
+                    max_price=max_price,
+                    min_rating=min_rating
+                )
+            st.write_stream(engine.stream_answer(query, results))
+        except LLMError as e:
+            st.error(f"Recommendation service is unavailable right now ({type(e).__name__}): {e}")
         st.markdown('</div>', unsafe_allow_html=True)
 
 # Footer Styling
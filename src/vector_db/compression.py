@@ -0,0 +1,121 @@
+import faiss
+import numpy as np
+
+STORAGE_TYPES = ('float32', 'float16', 'int8')
+
+
+class EmbeddingCodec:
+    """Optional PCA reduction followed by float16 or per-dimension int8 scalar quantization."""
+
+    def __init__(self, storage='float32', pca_dim=None):
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown storage {storage!r}; expected one of {STORAGE_TYPES}")
+        self.storage = storage
+        self.pca_dim = pca_dim
+        self.mean = None
+        self.components = None
+        self.vmin = None
+        self.scale = None
+
+    @property
+    def lossy(self):
+        return self.storage != 'float32' or bool(self.pca_dim)
+
+    def fit(self, embeddings, sample_size=100000, seed=0):
+        embeddings = np.asarray(embeddings, dtype='float32')
+        if len(embeddings) > sample_size:
+            rng = np.random.default_rng(seed)
+            embeddings = embeddings[rng.choice(len(embeddings), size=sample_size, replace=False)]
+        if self.pca_dim:
+            if self.pca_dim > embeddings.shape[1]:
+                raise ValueError(f"pca_dim={self.pca_dim} exceeds the embedding dimension {embeddings.shape[1]}")
+            self.mean = embeddings.mean(axis=0)
+            centered = embeddings - self.mean
+            # Principal axes from the covariance eigendecomposition, largest variance first
+            eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)
+            self.components = np.ascontiguousarray(eigenvectors[:, ::-1][:, :self.pca_dim], dtype='float32')
+        if self.storage == 'int8':
+            projected = self.project(embeddings)
+            self.vmin = projected.min(axis=0)
+            span = projected.max(axis=0) - self.vmin
+            self.scale = np.where(span > 0, span / 255.0, 1.0).astype('float32')
+        return self
+
+    @property
+    def dim(self):
+        return self.components.shape[1] if self.components is not None else None
+
+    def project(self, vectors):
+        vectors = np.asarray(vectors, dtype='float32')
+        if self.components is None:
+            return vectors
+        return np.ascontiguousarray((vectors - self.mean) @ self.components, dtype='float32')
+
+    def encode(self, vectors):
+        projected = self.project(vectors)
+        if self.storage == 'float16':
+            return projected.astype('float16')
+        if self.storage == 'int8':
+            codes = np.rint((projected - self.vmin) / self.scale)
+            return np.clip(codes, 0, 255).astype('uint8')
+        return projected
+
+    def decode(self, codes):
+        if self.storage == 'int8':
+            return (np.asarray(codes, dtype='float32') * self.scale + self.vmin).astype('float32')
+        return np.asarray(codes, dtype='float32')
+
+    def save(self, path):
+        arrays = {'storage': np.array(self.storage), 'pca_dim': np.array(self.pca_dim or 0)}
+        for name in ('mean', 'components', 'vmin', 'scale'):
+            value = getattr(self, name)
+            if value is not None:
+                arrays[name] = value
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            codec = cls(storage=str(data['storage']), pca_dim=int(data['pca_dim']) or None)
+            for name in ('mean', 'components', 'vmin', 'scale'):
+                if name in data:
+                    setattr(codec, name, data[name])
+        return codec
+
+
+def compression_report(embeddings, codec, codes, k=10, n_queries=200, rescore_factor=4, seed=0):
+    """Memory saved and recall@k lost by `codec`, with and without full-precision rescoring."""
+    embeddings = np.asarray(embeddings, dtype='float32')
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(embeddings), size=min(n_queries, len(embeddings)), replace=False)
+    queries = embeddings[sample]
+    k = min(k, len(embeddings))
+    shortlist = min(k * rescore_factor, len(embeddings))
+
+    exact = faiss.IndexFlatL2(embeddings.shape[1])
+    exact.add(embeddings)
+    _, truth = exact.search(queries, k)
+
+    approx = faiss.IndexFlatL2(codes.shape[1])
+    approx.add(codec.decode(codes))
+    _, found = approx.search(codec.project(queries), shortlist)
+
+    hits = rescored_hits = 0
+    for query, true_ids, ids in zip(queries, truth, found):
+        hits += len(set(true_ids) & set(ids[:k]))
+        distances = ((embeddings[ids] - query) ** 2).sum(axis=1)
+        rescored = ids[np.argsort(distances, kind='stable')[:k]]
+        rescored_hits += len(set(true_ids) & set(rescored))
+
+    total = len(queries) * k
+    return {
+        'storage': codec.storage,
+        'pca_dim': codec.pca_dim,
+        'full_bytes': int(embeddings.nbytes),
+        'compressed_bytes': int(codes.nbytes),
+        'memory_saved': 1 - codes.nbytes / embeddings.nbytes,
+        'k': int(k),
+        'rescore_factor': int(rescore_factor),
+        'recall_at_k': hits / total,
+        'recall_at_k_rescored': rescored_hits / total,
+    }
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+ONNX_MODEL_DIR = 'models/onnx'
+
+
+def sentence_transformer(model_name, **kwargs):
+    # Deferred imports: torch is only loaded once a torch-backed model is actually built, so the
+    # ONNX backend and plain `import` of the serving modules never pay for it
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, **kwargs)
+
+
+def cross_encoder(model_name, **kwargs):
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(model_name, **kwargs)
+
+
+def _pooling_mode(pooling):
+    # sentence-transformers >= 6 exposes a single pooling_mode; older releases use boolean flags
+    mode = getattr(pooling, 'pooling_mode', None)
+    if isinstance(mode, (list, tuple)):
+        mode = mode[0]
+    if mode:
+        return mode
+    if getattr(pooling, 'pooling_mode_cls_token', False):
+        return 'cls'
+    if getattr(pooling, 'pooling_mode_max_tokens', False):
+        return 'max'
+    return 'mean'
+
+
+def export_onnx(model_name, output_dir, quantize=True, opset=17):
+    """Export a SentenceTransformer to ONNX (plus an int8 dynamic-quantized copy) under `output_dir`.
+
+    This is a one-off build step that needs torch and onnx; serving only needs onnxruntime
+    and tokenizers.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device='cpu')
+    transformer = st[0].auto_model.eval()
+    save_embedder_config(st, model_name, output_dir)
+
+    dummy = st.tokenizer(["an example restaurant"], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in dummy]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+    fp32_path = os.path.join(output_dir, 'model.onnx')
+
+    class _Graph(torch.nn.Module):
+        # Named inputs and a plain tensor output; recent transformers reject positional
+        # inputs in the tracing exporter
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs))).last_hidden_state
+
+    with torch.no_grad():
+        torch.onnx.export(_Graph().eval(), tuple(dummy[name] for name in input_names), fp32_path,
+                          input_names=input_names, output_names=['last_hidden_state'],
+                          dynamic_axes=dynamic_axes, opset_version=opset, dynamo=False)
+
+    if quantize:
+        quantize_onnx(output_dir)
+    return output_dir
+
+
+def save_embedder_config(st, model_name, output_dir):
+    # Tokenizer and pooling settings the ONNX graph needs around it to reproduce st.encode()
+    os.makedirs(output_dir, exist_ok=True)
+    st.tokenizer.save_pretrained(output_dir)
+    if not os.path.exists(os.path.join(output_dir, 'tokenizer.json')):
+        raise RuntimeError(f"{model_name} has no fast tokenizer; the ONNX backend needs tokenizer.json")
+    config = {
+        'model_name': model_name,
+        'pooling': _pooling_mode(st[1]) if len(st) > 1 else 'mean',
+        'normalize': any(type(module).__name__ == 'Normalize' for module in st),
+        'max_seq_length': st.max_seq_length,
+        'pad_token': st.tokenizer.pad_token,
+        'pad_token_id': st.tokenizer.pad_token_id,
+    }
+    with open(os.path.join(output_dir, 'embedder_config.json'), 'w') as f:
+        json.dump(config, f, indent=2)
+
+
+def quantize_onnx(model_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    # Dynamic quantization: int8 weights, activations quantized on the fly per batch
+    quantize_dynamic(os.path.join(model_dir, 'model.onnx'), os.path.join(model_dir, 'model_int8.onnx'),
+                     weight_type=QuantType.QInt8)
+
+
+def onnx_model_dir(model_name):
+    return os.path.join(ONNX_MODEL_DIR, model_name.replace('/', '__'))
+
+
+def ensure_onnx_export(model_name, quantized=False, model_dir=None):
+    """Build step (ingest / CLI): export the model, and its int8 copy, unless already on disk."""
+    model_dir = model_dir or onnx_model_dir(model_name)
+    if not os.path.exists(os.path.join(model_dir, 'embedder_config.json')):
+        print(f"Exporting {model_name} to ONNX in {model_dir}...")
+        export_onnx(model_name, model_dir, quantize=quantized)
+    elif quantized and not os.path.exists(os.path.join(model_dir, 'model_int8.onnx')):
+        quantize_onnx(model_dir)
+    return model_dir
+
+
+class OnnxEmbedder:
+    """ONNX Runtime port of a SentenceTransformer: tokenizer + transformer graph + pooling in numpy."""
+
+    def __init__(self, model_name='all-MiniLM-L6-v2', quantized=False, model_dir=None, threads=None):
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.quantized = quantized
+        self.model_dir = model_dir or onnx_model_dir(model_name)
+        model_file = 'model_int8.onnx' if quantized else 'model.onnx'
+        # Serving never exports: that needs torch and onnx, and would stall the first request
+        for required in ('embedder_config.json', model_file):
+            if not os.path.exists(os.path.join(self.model_dir, required)):
+                raise FileNotFoundError(
+                    f"No ONNX export of {model_name} in {self.model_dir} (missing {required}). Build it once with "
+                    f"`python -m src.vector_db.embedders --export --model {model_name}` or ingest with "
+                    f"--embedding-backend {'onnx-int8' if quantized else 'onnx'}.")
+        with open(os.path.join(self.model_dir, 'embedder_config.json')) as f:
+            self.config = json.load(f)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.config['max_seq_length'])
+        self.tokenizer.enable_padding(pad_id=self.config['pad_token_id'], pad_token=self.config['pad_token'])
+        self.session = self._open_session(os.path.join(self.model_dir, model_file), threads)
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    @staticmethod
+    def _open_session(path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        return ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+
+    def _pool(self, hidden, mask):
+        pooling = self.config['pooling']
+        if pooling == 'cls':
+            pooled = hidden[:, 0]
+        elif pooling == 'max':
+            pooled = np.where(mask[:, :, None] > 0, hidden, -np.inf).max(axis=1)
+        else:
+            weights = mask[:, :, None].astype('float32')
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.config['normalize']:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype('float32')
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        outputs = []
+        for start in range(0, len(sentences), batch_size):
+            encodings = self.tokenizer.encode_batch([str(s) for s in sentences[start:start + batch_size]])
+            feeds = {
+                'input_ids': np.array([e.ids for e in encodings], dtype='int64'),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype='int64'),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype='int64'),
+            }
+            hidden = self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+            outputs.append(self._pool(hidden, feeds['attention_mask']))
+        if not outputs:
+            return np.empty((0, 0), dtype='float32')
+        return np.vstack(outputs)
+
+
+def load_embedder(backend, model_name='all-MiniLM-L6-v2', **kwargs):
+    """Build the query/document encoder for `backend`; every backend exposes encode(sentences)."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {EMBEDDING_BACKENDS}")
+    if backend == 'torch':
+        return sentence_transformer(model_name, **kwargs)
+    return OnnxEmbedder(model_name, quantized=backend == 'onnx-int8', **kwargs)
+
+
+def parity_check(reference, candidate, sentences):
+    """Row-wise cosine similarity between two encoders' embeddings of the same sentences."""
+    a = np.asarray(reference.encode(sentences), dtype='float32')
+    b = np.asarray(candidate.encode(sentences), dtype='float32')
+    cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {'min_cosine': float(cosine.min()), 'mean_cosine': float(cosine.mean())}
+
+
+def benchmark_embedder(embedder, sentences, batch_size=32, repeats=3):
+    """Single-query latency (as in serving) and batch throughput (as in ingest) for one encoder."""
+    embedder.encode(sentences[:batch_size])  # warm-up
+    single = []
+    for sentence in sentences[:50]:
+        start = time.perf_counter()
+        embedder.encode([sentence])
+        single.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        embedder.encode(sentences, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        'query_p50_ms': float(np.percentile(single, 50)),
+        'query_p95_ms': float(np.percentile(single, 95)),
+        'batch_docs_per_s': len(sentences) * repeats / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    from src.data.artifacts import PROCESSED_PATH, read_processed
+
+    parser = argparse.ArgumentParser(description="Compare embedding backends: cosine parity and latency")
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--backends', nargs='+', choices=EMBEDDING_BACKENDS, default=list(EMBEDDING_BACKENDS))
+    parser.add_argument('--samples', type=int, default=512)
+    parser.add_argument('--export', action='store_true', help="Export the ONNX and int8 models, then exit")
+    args = parser.parse_args()
+
+    if args.export:
+        print(f"ONNX models written to {ensure_onnx_export(args.model, quantized=True)}")
+        sys.exit(0)
+
+    documents = read_processed(PROCESSED_PATH, columns=['document_string'])['document_string']
+    sentences = documents.head(args.samples).tolist()
+    reference = load_embedder('torch', args.model)
+    report = {}
+    for backend in args.backends:
+        embedder = reference if backend == 'torch' else load_embedder(backend, args.model)
+        report[backend] = benchmark_embedder(embedder, sentences)
+        report[backend].update(parity_check(reference, embedder, sentences))
+        print(f"{backend}: {report[backend]}")
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,60 @@
+import hashlib
+import os
+
+import numpy as np
+
+
+def document_key(document, model_name):
+    # Embeddings depend on both the text and the model that produced them
+    return hashlib.sha256(f"{model_name}\x00{document}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent content-hash -> embedding store used for incremental ingestion."""
+
+    def __init__(self, path):
+        self.path = path
+        self.vectors = {}
+        if os.path.exists(path):
+            with np.load(path) as data:
+                self.vectors = dict(zip(data['keys'].tolist(), data['vectors']))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def embed(self, documents, model_name, encode):
+        """Return embeddings for `documents`, calling `encode` only for texts not seen before.
+
+        Entries for documents that are no longer present are dropped, so the cache always
+        mirrors the current dataset. Returns (embeddings, stats).
+        """
+        keys = [document_key(doc, model_name) for doc in documents]
+        missing = {}
+        for key, doc in zip(keys, documents):
+            if key not in self.vectors and key not in missing:
+                missing[key] = doc
+
+        if missing:
+            encoded = np.asarray(encode(list(missing.values())), dtype='float32')
+            self.vectors.update(zip(missing.keys(), encoded))
+
+        current = set(keys)
+        stale = [key for key in self.vectors if key not in current]
+        for key in stale:
+            del self.vectors[key]
+
+        stats = {'reused': len(current) - len(missing), 'encoded': len(missing), 'removed': len(stale)}
+        if not keys:
+            return np.empty((0, 0), dtype='float32'), stats
+        return np.vstack([self.vectors[key] for key in keys]).astype('float32'), stats
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        keys = np.array(list(self.vectors.keys()))
+        vectors = np.vstack(list(self.vectors.values())) if self.vectors else np.empty((0, 0), dtype='float32')
+        # Write to a temp file first so an interrupted run never leaves a truncated cache
+        tmp_path = self.path + '.tmp.npz'
+        np.savez(tmp_path, keys=keys, vectors=vectors)
+        os.replace(tmp_path, self.path)
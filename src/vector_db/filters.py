@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class RestaurantFilterIndex:
+    """Columnar indexes over the metadata, built once at load time and shared by every query.
+
+    Location filters use posting lists per distinct location, price and rating filters use
+    sorted arrays with binary-search range lookups. Only the smallest candidate set is
+    materialised; the other predicates are checked against plain NumPy columns.
+    """
+
+    def __init__(self, metadata):
+        self.size = len(metadata)
+
+        # Location posting lists: distinct (lower-cased) location -> sorted row positions
+        locations = metadata['location'].fillna('').astype(str).str.lower().to_numpy()
+        uniques, codes = np.unique(locations, return_inverse=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.location_names = uniques.tolist()
+        self.location_codes = codes.astype('int32')
+        self.location_postings = [order[bounds[i]:bounds[i + 1]].astype('int32') for i in range(len(uniques))]
+        self._location_cache = {}
+
+        self.cost = metadata['approx_cost_two'].to_numpy(dtype='float64')
+        self.rating = metadata['rate_float'].to_numpy(dtype='float64')
+        self.cost_order, self.cost_sorted = _sorted_column(self.cost)
+        self.rating_order, self.rating_sorted = _sorted_column(self.rating)
+
+    def _location_match(self, location):
+        # Same semantics as str.contains(location, case=False), resolved once per distinct value
+        # and cached as (matching location codes, sorted row positions)
+        key = location.lower()
+        match = self._location_cache.get(key)
+        if match is None:
+            codes = np.array([i for i, loc in enumerate(self.location_names) if key in loc], dtype='int32')
+            if len(codes):
+                rows = np.sort(np.concatenate([self.location_postings[i] for i in codes]))
+            else:
+                rows = np.empty(0, dtype='int32')
+            rows.setflags(write=False)
+            match = (codes, rows)
+            if len(self._location_cache) >= 1024:
+                self._location_cache.clear()
+            self._location_cache[key] = match
+        return match
+
+    def _location_rows(self, location):
+        return self._location_match(location)[1]
+
+    def _price_rows(self, max_price):
+        end = np.searchsorted(self.cost_sorted, max_price, side='right')
+        return self.cost_order[:end]
+
+    def _rating_rows(self, min_rating):
+        start = np.searchsorted(self.rating_sorted, min_rating, side='left')
+        return self.rating_order[start:]
+
+    def select(self, location=None, max_price=None, min_rating=0.0):
+        """Return sorted row positions passing every filter, or None if no filter applies."""
+        candidates = []
+        if location and location != "Any":
+            candidates.append(('location', self._location_rows(location)))
+        if max_price:
+            candidates.append(('price', self._price_rows(max_price)))
+        if min_rating:
+            candidates.append(('rating', self._rating_rows(min_rating)))
+        if not candidates:
+            return None
+
+        # Start from the most selective posting list and verify the rest column-wise
+        name, rows = min(candidates, key=lambda c: len(c[1]))
+        if len(candidates) == 1:
+            return rows if name == 'location' else np.sort(rows)
+
+        keep = np.ones(len(rows), dtype=bool)
+        if name != 'location' and location and location != "Any":
+            keep &= np.isin(self.location_codes[rows], self._location_match(location)[0])
+        if name != 'price' and max_price:
+            keep &= self.cost[rows] <= max_price
+        if name != 'rating' and min_rating:
+            keep &= self.rating[rows] >= min_rating
+        rows = rows[keep]
+        return rows if name == 'location' else np.sort(rows)
+
+
+def _sorted_column(values):
+    # NaNs can never satisfy a range filter, so they are left out of the sorted view
+    valid = np.flatnonzero(~np.isnan(values))
+    order = valid[np.argsort(values[valid], kind='stable')].astype('int32')
+    return order, values[order]
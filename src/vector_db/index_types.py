@@ -0,0 +1,100 @@
+import time
+
+import faiss
+import numpy as np
+
+from src.vector_db.compression import STORAGE_TYPES
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'hnsw', 'ivf_pq')
+# FAISS scalar quantizers matching the compressed storage types
+SQ_TYPES = {'float16': faiss.ScalarQuantizer.QT_fp16, 'int8': faiss.ScalarQuantizer.QT_8bit}
+
+def default_nlist(n):
+    # A common rule of thumb: ~4*sqrt(n) inverted lists, but never more than we have points
+    return max(1, min(n, int(4 * np.sqrt(n))))
+
+def default_nprobe(nlist):
+    # FAISS probes a single list by default, which loses most neighbours; ~1/16 of the lists
+    # (at least 8) keeps recall high for little extra latency
+    return min(nlist, max(8, nlist // 16))
+
+def default_pq_m(dimension, target=48):
+    # Sub-quantizers must divide the dimension: 384 -> 48, 128 (PCA) -> 32, 192 -> 48
+    return max(m for m in range(1, min(target, dimension) + 1) if dimension % m == 0)
+
+def build_index(embeddings, index_type='flat', nlist=None, m=32, nbits=8, pq_m=None, ef_construction=200,
+                storage='float32'):
+    """Build (and train, if needed) a FAISS index of the requested type over `embeddings`."""
+    n, dimension = embeddings.shape
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index_type {index_type!r}; expected one of {INDEX_TYPES}")
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown storage {storage!r}; expected one of {STORAGE_TYPES}")
+    if storage != 'float32' and index_type == 'ivf_pq':
+        raise ValueError("ivf_pq already stores compressed codes; use storage='float32'")
+    sq_type = SQ_TYPES.get(storage)
+    nlist = nlist or default_nlist(n)
+    
+    if index_type == 'flat':
+        index = faiss.IndexScalarQuantizer(dimension, sq_type) if sq_type is not None else faiss.IndexFlatL2(dimension)
+    elif index_type == 'ivf_flat':
+        if sq_type is not None:
+            index = faiss.IndexIVFScalarQuantizer(faiss.IndexFlatL2(dimension), dimension, nlist, sq_type)
+        else:
+            index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dimension), dimension, nlist)
+    elif index_type == 'hnsw':
+        index = faiss.IndexHNSWSQ(dimension, sq_type, m) if sq_type is not None else faiss.IndexHNSWFlat(dimension, m)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        pq_m = pq_m or default_pq_m(dimension)
+        if dimension % pq_m:
+            raise ValueError(f"pq_m={pq_m} must divide the embedding dimension {dimension}")
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dimension), dimension, nlist, pq_m, nbits)
+    
+    if not index.is_trained:
+        index.train(embeddings)
+    index.add(embeddings)
+    return index
+
+def index_nprobe(index, nprobe=None):
+    """nprobe to serve an IVF index with (the default for its nlist if unset); None for other types."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None:
+        return None
+    return nprobe or default_nprobe(ivf.nlist)
+
+def apply_search_params(index, nprobe=None, ef_search=None):
+    # Search-time knobs: nprobe for IVF indexes, efSearch for HNSW
+    params = faiss.ParameterSpace()
+    nprobe = index_nprobe(index, nprobe)
+    if nprobe:
+        params.set_index_parameter(index, 'nprobe', nprobe)
+    if ef_search and isinstance(index, faiss.IndexHNSW):
+        params.set_index_parameter(index, 'efSearch', ef_search)
+    return index
+
+def evaluate_index(index, embeddings, k=10, n_queries=200, seed=0):
+    """Compare `index` against exact search on a sample of the stored vectors: recall@k and latency."""
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(embeddings), size=min(n_queries, len(embeddings)), replace=False)
+    queries = np.ascontiguousarray(embeddings[sample], dtype='float32')
+    k = min(k, len(embeddings))
+    
+    exact = faiss.IndexFlatL2(embeddings.shape[1])
+    exact.add(embeddings)
+    start = time.perf_counter()
+    _, truth = exact.search(queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    index_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return {
+        'k': int(k),
+        'queries': int(len(queries)),
+        'recall_at_k': hits / (len(queries) * k),
+        'exact_ms_per_query': exact_ms,
+        'index_ms_per_query': index_ms,
+    }
@@ -1,46 +1,180 @@
-from sentence_transformers import SentenceTransformer
 import pandas as pd
 import faiss
 import numpy as np
 import os
-import pickle
+import json
+import sys
+import argparse
+from functools import partial
 
-def initialize_vector_db(csv_path='processed_data/restaurants_processed.csv', 
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.data.artifacts import PROCESSED_PATH, METADATA_COLUMNS, read_processed, write_metadata
+from src.vector_db.compression import STORAGE_TYPES, EmbeddingCodec, compression_report
+from src.vector_db.embedders import EMBEDDING_BACKENDS, ensure_onnx_export, load_embedder, sentence_transformer
+from src.vector_db.embedding_cache import EmbeddingCache
+from src.vector_db.index_types import INDEX_TYPES, apply_search_params, build_index, evaluate_index, index_nprobe
+from src.vector_db.lexical import BM25Index
+from src.vector_db.parallel_encode import encode_in_chunks
+
+# Fields indexed for exact dish / name / cuisine matches alongside the embeddings
+LEXICAL_COLUMNS = ['document_string', 'dish_liked', 'cuisines']
+
+def initialize_vector_db(data_path=PROCESSED_PATH, 
                          model_name='all-MiniLM-L6-v2',
-                         output_dir='vector_store'):
+                         output_dir='vector_store',
+                         index_type='flat',
+                         index_params=None,
+                         nprobe=None,
+                         ef_search=None,
+                         incremental=True,
+                         cache_path=None,
+                         workers=None,
+                         chunk_size=None,
+                         storage='float32',
+                         pca_dim=None,
+                         rescore_factor=4,
+                         embedding_backend='torch'):
     
-    print(f"Loading processed data from {csv_path}...")
-    df = pd.read_csv(csv_path)
+    print(f"Loading processed data from {data_path}...")
+    # Only the columns the vector store needs are decoded
+    df = read_processed(data_path, columns=METADATA_COLUMNS)
     
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
     
-    print(f"Loading embedding model: {model_name}...")
-    model = SentenceTransformer(model_name)
+    model = None
+    model_factory = sentence_transformer if embedding_backend == 'torch' else partial(load_embedder, embedding_backend)
+    if embedding_backend != 'torch':
+        # Ingest is the build step, so this is where the ONNX export happens; serving only loads it
+        ensure_onnx_export(model_name, quantized=embedding_backend == 'onnx-int8')
+    def encode(sentences):
+        nonlocal model
+        if chunk_size:
+            # Chunked mode: a process pool encodes checkpointed chunks, resumable after a crash
+            print(f"Generating embeddings for {len(sentences)} restaurants in chunks of {chunk_size}...")
+            return encode_in_chunks(sentences, model_name, model_factory, workers=workers,
+                                    chunk_size=chunk_size,
+                                    checkpoint_dir=os.path.join(output_dir, 'embedding_chunks'))
+        if model is None:
+            print(f"Loading embedding model: {model_name} ({embedding_backend})...")
+            model = model_factory(model_name)
+        print(f"Generating embeddings for {len(sentences)} restaurants...")
+        # This might take a few minutes
+        return model.encode(sentences, show_progress_bar=True)
     
-    print(f"Generating embeddings for {len(df)} restaurants...")
-    # This might take a few minutes
     sentences = df['document_string'].tolist()
-    embeddings = model.encode(sentences, show_progress_bar=True)
-    embeddings = np.array(embeddings).astype('float32')
+    if incremental:
+        # Content-hash cache: only new or changed document strings are encoded, and
+        # entries for restaurants that disappeared are dropped before the index is rebuilt
+        cache = EmbeddingCache(cache_path or os.path.join(output_dir, 'embedding_cache.npz'))
+        # Quantized backends produce slightly different vectors, so they get their own cache entries
+        cache_model = model_name if embedding_backend == 'torch' else f"{model_name}@{embedding_backend}"
+        embeddings, stats = cache.embed(sentences, cache_model, encode)
+        cache.save()
+        print(f"Embedding cache: {stats['reused']} reused, {stats['encoded']} encoded, {stats['removed']} removed")
+    else:
+        embeddings = np.array(encode(sentences)).astype('float32')
+    
+    # Optional compressed storage: PCA reduction and/or float16/int8 codes. The FAISS index and
+    # the filtered-scan matrix hold the compressed vectors; embeddings.npy keeps full precision
+    # so search can rescore a shortlist
+    codec = EmbeddingCodec(storage=storage, pca_dim=pca_dim).fit(embeddings)
+    index_vectors = codec.project(embeddings)
+    compression = None
+    if codec.lossy:
+        codes = codec.encode(embeddings)
+        compression = compression_report(embeddings, codec, codes, rescore_factor=rescore_factor)
+        print(f"Compression ({storage}, PCA {pca_dim or 'off'}): {compression['full_bytes'] / 1e6:.1f} MB -> "
+              f"{compression['compressed_bytes'] / 1e6:.1f} MB ({compression['memory_saved']:.0%} saved) | "
+              f"recall@{compression['k']}: {compression['recall_at_k']:.3f}, "
+              f"{compression['recall_at_k_rescored']:.3f} with x{rescore_factor} rescoring")
     
     # 3. Create FAISS Index
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
+    print(f"Building '{index_type}' FAISS index...")
+    index = build_index(index_vectors, index_type=index_type, storage=storage, **(index_params or {}))
+    # Recorded in index_config below, so search serves IVF indexes with this nprobe rather than 1
+    nprobe = index_nprobe(index, nprobe)
+    apply_search_params(index, nprobe=nprobe, ef_search=ef_search)
+    
+    report = evaluate_index(index, index_vectors)
+    print(f"recall@{report['k']} vs exact: {report['recall_at_k']:.3f} | "
+          f"latency: {report['index_ms_per_query']:.3f} ms/query ({index_type}) vs "
+          f"{report['exact_ms_per_query']:.3f} ms/query (flat)")
     
     print(f"Saving FAISS index and metadata to {output_dir}...")
     faiss.write_index(index, os.path.join(output_dir, 'restaurant_index.faiss'))
     
+    # Raw embeddings, row-aligned with metadata, for exact search over filtered subsets
+    np.save(os.path.join(output_dir, 'embeddings.npy'), embeddings)
+    codes_path = os.path.join(output_dir, 'embeddings_codes.npy')
+    codec_path = os.path.join(output_dir, 'codec.npz')
+    if codec.lossy:
+        np.save(codes_path, codes)
+        codec.save(codec_path)
+    else:
+        # Don't leave codes from a previous compressed build next to a float32 index
+        for stale_path in (codes_path, codec_path):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+    
+    # Index type and search-time knobs, so RestaurantSearch loads and tunes the index correctly
+    index_config = {
+        'index_type': index_type,
+        'index_params': index_params or {},
+        'nprobe': nprobe,
+        'ef_search': ef_search,
+        'model_name': model_name,
+        'embedding_backend': embedding_backend,
+        'storage': storage,
+        'pca_dim': pca_dim,
+        'rescore_factor': rescore_factor,
+        'report': report,
+        'compression': compression,
+    }
+    with open(os.path.join(output_dir, 'index_config.json'), 'w') as f:
+        json.dump(index_config, f, indent=2)
+    
+    # BM25 inverted index for the lexical half of hybrid retrieval, row-aligned with the metadata
+    print("Building BM25 lexical index...")
+    lexical_text = df[LEXICAL_COLUMNS].fillna('').astype(str).agg(' '.join, axis=1)
+    BM25Index.build(lexical_text.tolist()).save(os.path.join(output_dir, 'lexical_index.npz'))
+    
     # Save the dataframe metadata (needed for retrieval)
-    # We only save necessary columns to save space
-    meta_cols = ['name', 'location', 'rate_float', 'approx_cost_two', 'cuisines', 'document_string']
-    df[meta_cols].to_pickle(os.path.join(output_dir, 'metadata.pkl'))
+    # We only save necessary columns, as a typed Arrow file that readers can memory-map
+    write_metadata(df, os.path.join(output_dir, 'metadata.arrow'))
     
     print("Vector database initialization complete!")
 
 if __name__ == "__main__":
-    if os.path.exists('processed_data/restaurants_processed.csv'):
-        initialize_vector_db()
+    parser = argparse.ArgumentParser(description="Build the FAISS vector store")
+    parser.add_argument('--index-type', choices=INDEX_TYPES, default='flat')
+    parser.add_argument('--nlist', type=int, default=None, help="IVF inverted lists")
+    parser.add_argument('--m', type=int, default=32, help="HNSW neighbours per node")
+    parser.add_argument('--pq-m', type=int, default=None, help="IVF-PQ sub-quantizers (default: a divisor of the dimension near 48)")
+    parser.add_argument('--nprobe', type=int, default=None, help="IVF lists probed at search time (default: nlist/16, at least 8)")
+    parser.add_argument('--ef-search', type=int, default=None, help="HNSW efSearch at search time")
+    parser.add_argument('--full', action='store_true', help="Re-encode everything, ignoring the embedding cache")
+    parser.add_argument('--storage', choices=STORAGE_TYPES, default='float32', help="Stored vector precision")
+    parser.add_argument('--pca-dim', type=int, default=None, help="Reduce embeddings to this many dimensions (e.g. 128, 192)")
+    parser.add_argument('--rescore-factor', type=int, default=4, help="Shortlist size multiple rescored at full precision")
+    parser.add_argument('--embedding-backend', choices=EMBEDDING_BACKENDS, default='torch')
+    parser.add_argument('--chunk-size', type=int, default=None, help="Encode in checkpointed chunks of this size")
+    parser.add_argument('--workers', type=int, default=None, help="Encoder processes for chunked mode (default: all cores)")
+    args = parser.parse_args()
+    
+    if os.path.exists(PROCESSED_PATH):
+        initialize_vector_db(index_type=args.index_type,
+                             index_params={'nlist': args.nlist, 'm': args.m, 'pq_m': args.pq_m},
+                             nprobe=args.nprobe,
+                             ef_search=args.ef_search,
+                             incremental=not args.full,
+                             workers=args.workers,
+                             chunk_size=args.chunk_size,
+                             storage=args.storage,
+                             pca_dim=args.pca_dim,
+                             rescore_factor=args.rescore_factor,
+                             embedding_backend=args.embedding_backend)
     else:
-        print("Error: processed_data/restaurants_processed.csv not found. Run Phase 1 first.")
+        print(f"Error: {PROCESSED_PATH} not found. Run Phase 1 first.")
@@ -0,0 +1,93 @@
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def reciprocal_rank_fusion(rankings, k=60, limit=None):
+    """Fuse ranked row lists by summing 1 / (k + rank); earlier lists win ties."""
+    scores = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            scores[int(row)] = scores.get(int(row), 0.0) + 1.0 / (k + rank + 1)
+    # sorted() is stable, so equal scores keep first-seen order
+    fused = sorted(scores, key=lambda row: -scores[row])
+    return np.array(fused[:limit], dtype='int64')
+
+
+class BM25Index:
+    """Okapi BM25 over restaurant text, stored as term posting lists (CSR layout)."""
+
+    def __init__(self, vocabulary, indptr, doc_ids, term_freqs, doc_lengths, k1=1.5, b=0.75):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(doc_lengths)
+        doc_freqs = np.diff(indptr)
+        self.idf = np.log(1 + (self.num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype('float32')
+        # Per-posting length normalisation is fixed at build time, so scoring is a gather + sum
+        avg_length = doc_lengths.mean() if self.num_docs else 0.0
+        norm = k1 * (1 - b + b * doc_lengths / avg_length) if avg_length else np.full(self.num_docs, k1)
+        self.weights = (term_freqs * (k1 + 1) / (term_freqs + norm[doc_ids])).astype('float32')
+
+    @classmethod
+    def build(cls, texts, k1=1.5, b=0.75):
+        postings = {}
+        doc_lengths = np.zeros(len(texts), dtype='float32')
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[row] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, []).append((row, count))
+
+        terms = sorted(postings)
+        indptr = np.zeros(len(terms) + 1, dtype='int64')
+        indptr[1:] = np.cumsum([len(postings[term]) for term in terms])
+        pairs = [pair for term in terms for pair in postings[term]]
+        doc_ids = np.array([row for row, _ in pairs], dtype='int64')
+        term_freqs = np.array([count for _, count in pairs], dtype='float32')
+        vocabulary = {term: i for i, term in enumerate(terms)}
+        return cls(vocabulary, indptr, doc_ids, term_freqs, doc_lengths, k1=k1, b=b)
+
+    def scores(self, query):
+        scores = np.zeros(self.num_docs, dtype='float32')
+        for token in set(tokenize(query)):
+            term = self.vocabulary.get(token)
+            if term is None:
+                continue
+            start, end = self.indptr[term], self.indptr[term + 1]
+            scores[self.doc_ids[start:end]] += self.idf[term] * self.weights[start:end]
+        return scores
+
+    def search(self, query, k, candidate_rows=None):
+        """Top-k rows by BM25 score (only rows with a matching term), optionally within `candidate_rows`."""
+        scores = self.scores(query)
+        rows = np.flatnonzero(scores) if candidate_rows is None else candidate_rows[scores[candidate_rows] > 0]
+        if len(rows) > k:
+            rows = rows[np.argpartition(-scores[rows], k)[:k]]
+        return rows[np.argsort(-scores[rows], kind='stable')]
+
+    def save(self, path):
+        terms = np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=str)
+        np.savez(path, terms=terms, indptr=self.indptr, doc_ids=self.doc_ids, term_freqs=self.term_freqs,
+                 doc_lengths=self.doc_lengths, params=np.array([self.k1, self.b]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            vocabulary = {term: i for i, term in enumerate(data['terms'].tolist())}
+            k1, b = data['params'].tolist()
+            return cls(vocabulary, data['indptr'], data['doc_ids'], data['term_freqs'], data['doc_lengths'],
+                       k1=k1, b=b)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+
+_worker_model = None
+
+
+def _init_worker(model_factory, model_name, threads):
+    # Each worker process loads the model once and keeps its intra-op threads to its share of
+    # the cores, so N workers do not oversubscribe the machine
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = model_factory(model_name)
+
+
+def _encode_chunk(chunk_path, sentences, batch_size, model=None):
+    model = model or _worker_model
+    embeddings = np.asarray(model.encode(sentences, batch_size=batch_size), dtype='float32')
+    _save_chunk(chunk_path, embeddings)
+    return chunk_path
+
+
+def _save_chunk(chunk_path, embeddings):
+    # Write-then-rename, so a crash mid-write never leaves a chunk that looks finished
+    tmp_path = chunk_path + '.tmp.npy'
+    np.save(tmp_path, embeddings)
+    os.replace(tmp_path, chunk_path)
+
+
+def _chunk_path(checkpoint_dir, model_name, sentences):
+    # Chunks are named by their content, so a resumed run reuses exactly the work already done
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    for sentence in sentences:
+        digest.update(b'\x00' + sentence.encode('utf-8'))
+    return os.path.join(checkpoint_dir, f"chunk_{digest.hexdigest()[:24]}.npy")
+
+
+def encode_in_chunks(sentences, model_name, model_factory, workers=None, chunk_size=2048,
+                     checkpoint_dir='vector_store/embedding_chunks', batch_size=64):
+    """Encode `sentences` in checkpointed chunks spread over a process pool.
+
+    Every finished chunk is written to `checkpoint_dir`; rerunning after an interruption only
+    encodes the chunks that are missing. The checkpoints are removed once all chunks are done.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    chunks = [sentences[i:i + chunk_size] for i in range(0, len(sentences), chunk_size)]
+    paths = [_chunk_path(checkpoint_dir, model_name, chunk) for chunk in chunks]
+    pending = [(path, chunk) for path, chunk in zip(paths, chunks) if not os.path.exists(path)]
+    if len(pending) < len(chunks):
+        print(f"Resuming: {len(chunks) - len(pending)} of {len(chunks)} chunks already encoded")
+
+    if pending and workers == 1:
+        # In-process: the caller's torch threading settings are left alone
+        model = model_factory(model_name)
+        for i, (path, chunk) in enumerate(pending, 1):
+            _encode_chunk(path, chunk, batch_size, model=model)
+            print(f"Encoded chunk {i}/{len(pending)}")
+    elif pending:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # Spawned, not forked: forking a process whose torch/tokenizers thread pools are already
+        # running can deadlock the children
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'), initializer=_init_worker,
+                                 initargs=(model_factory, model_name, threads)) as pool:
+            futures = [pool.submit(_encode_chunk, path, chunk, batch_size) for path, chunk in pending]
+            for i, future in enumerate(as_completed(futures), 1):
+                future.result()
+                print(f"Encoded chunk {i}/{len(pending)}")
+
+    if not chunks:
+        return np.empty((0, 0), dtype='float32')
+    embeddings = np.vstack([np.load(path) for path in paths]).astype('float32')
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    return embeddings
@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.vector_db.embedders import cross_encoder
+
+
+class CrossEncoderReranker:
+    """Re-scores the top bi-encoder candidates with a local cross-encoder, within a latency budget.
+
+    Candidates are scored in batches; if the budget runs out before every batch is scored the
+    bi-encoder order is returned unchanged, so the CPU cost per request stays bounded.
+    """
+
+    def __init__(self, model_name='cross-encoder/ms-marco-MiniLM-L-6-v2', max_candidates=20, top_k=3,
+                 batch_size=8, budget_ms=150, clock=time.perf_counter):
+        self.model_name = model_name
+        self.max_candidates = max_candidates
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self.clock = clock
+        self._model = None
+        self._lock = threading.Lock()
+        self.reranked = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_env(cls):
+        # Reranking is opt-in: set RERANKER_MODEL to enable it
+        model_name = os.getenv("RERANKER_MODEL")
+        if not model_name:
+            return None
+        return cls(
+            model_name=model_name,
+            max_candidates=int(os.getenv("RERANK_CANDIDATES", "20")),
+            top_k=int(os.getenv("RERANK_TOP_K", "3")),
+            budget_ms=float(os.getenv("RERANK_BUDGET_MS", "150")),
+        )
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                self._model = cross_encoder(self.model_name)
+        return self._model
+
+    def rerank(self, query, candidates, top_k=None):
+        """Return the best `top_k` rows of `candidates` (a DataFrame in bi-encoder order)."""
+        top_k = top_k or self.top_k
+        candidates = candidates.head(self.max_candidates)
+        if len(candidates) <= 1:
+            return candidates.head(top_k)
+
+        start = self.clock()
+        documents = candidates['document_string'].tolist()
+        scores = []
+        for offset in range(0, len(documents), self.batch_size):
+            # The budget is checked between batches, so a request overshoots by at most one batch
+            if (self.clock() - start) * 1000 >= self.budget_ms:
+                with self._lock:
+                    self.fallbacks += 1
+                return candidates.head(top_k)
+            pairs = [(query, doc) for doc in documents[offset:offset + self.batch_size]]
+            scores.extend(np.asarray(self.model.predict(pairs, batch_size=self.batch_size)).tolist())
+
+        with self._lock:
+            self.reranked += 1
+        order = np.argsort(-np.asarray(scores), kind='stable')[:top_k]
+        return candidates.iloc[order]
+
+    def stats(self):
+        with self._lock:
+            return {'reranked': self.reranked, 'fallbacks': self.fallbacks}
@@ -1,65 +1,284 @@
-from sentence_transformers import SentenceTransformer
 import faiss
 import pandas as pd
+import pyarrow as pa
 import numpy as np
 import os
-import pickle
+import sys
+import json
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.cache import LRUCache
+from src.metrics import counter, histogram, timed
+from src.data.artifacts import open_metadata
+from src.vector_db.compression import EmbeddingCodec
+from src.vector_db.embedders import load_embedder, sentence_transformer
+from src.vector_db.filters import RestaurantFilterIndex
+from src.vector_db.lexical import BM25Index, reciprocal_rank_fusion
+from src.vector_db.index_types import apply_search_params
+
+# Zero-copy mmap of the index storage where FAISS supports it, shared across worker processes
+MMAP_FLAGS = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+FILTER_COLUMNS = ['location', 'approx_cost_two', 'rate_float']
+
+CANDIDATE_SET_SIZE = histogram('restaurant_candidate_set_size', "Rows surviving the hard filters per query",
+                               buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000))
+EMPTY_RESULTS = counter('restaurant_search_empty_results', "Queries whose hard filters matched no restaurant")
+RATING_FALLBACKS = counter('restaurant_search_rating_fallbacks',
+                           "Filtered queries answered by the rating-sort fallback instead of similarity")
+QUERY_CACHE_LOOKUPS = counter('restaurant_query_cache_lookups', "Query-embedding cache lookups", ['result'])
 
 class RestaurantSearch:
-    def __init__(self, vector_store_path='vector_store'):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.index = faiss.read_index(os.path.join(vector_store_path, 'restaurant_index.faiss'))
-        self.metadata = pd.read_pickle(os.path.join(vector_store_path, 'metadata.pkl'))
+    def __init__(self, vector_store_path='vector_store', query_cache_size=1024, query_cache_ttl=3600,
+                 nprobe=None, ef_search=None, mmap=False, rescore_factor=None, hybrid=True, rrf_k=60,
+                 embedding_backend=None):
+        # Stores built before index types were selectable have no config and hold a flat index
+        self.index_config = self._load_index_config(vector_store_path)
+        # Queries must be encoded like the documents were: the store's recorded model and backend,
+        # unless overridden by the argument or EMBEDDING_BACKEND (ONNX Runtime on CPU nodes)
+        model_name = self.index_config.get('model_name') or 'all-MiniLM-L6-v2'
+        backend = (embedding_backend or os.getenv('EMBEDDING_BACKEND')
+                   or self.index_config.get('embedding_backend') or 'torch')
+        if backend == 'torch':
+            self.model = sentence_transformer(model_name)
+        else:
+            self.model = load_embedder(backend, model_name)
+        index_path = os.path.join(vector_store_path, 'restaurant_index.faiss')
+        self.mmap = mmap
+        self.index = faiss.read_index(index_path, MMAP_FLAGS) if mmap else faiss.read_index(index_path)
+        apply_search_params(self.index,
+                            nprobe=nprobe or self.index_config.get('nprobe'),
+                            ef_search=ef_search or self.index_config.get('ef_search'))
+        
+        # Metadata stays in Arrow (memory-mapped in mmap mode, so it lives in the page cache and is
+        # shared by every process on the host); only the filter columns and the final top-k rows
+        # are materialised as pandas. Stores written before the Arrow format fall back to the pickle.
+        arrow_path = os.path.join(vector_store_path, 'metadata.arrow')
+        if os.path.exists(arrow_path):
+            self.table = open_metadata(arrow_path, memory_map=mmap)
+            self._metadata = None
+            filter_columns = self.table.select(FILTER_COLUMNS).to_pandas()
+        else:
+            self.table = None
+            self._metadata = pd.read_pickle(os.path.join(vector_store_path, 'metadata.pkl'))
+            filter_columns = self._metadata
+        self.num_rows = len(filter_columns)
+        self.locations = sorted(filter_columns['location'].dropna().unique().tolist())
+        # Compressed stores scan PCA-reduced / quantized codes and rescore a shortlist of
+        # rescore_factor * top_k rows against the full-precision vectors
+        codec_path = os.path.join(vector_store_path, 'codec.npz')
+        self.codec = EmbeddingCodec.load(codec_path) if os.path.exists(codec_path) else None
+        self.rescore_factor = rescore_factor or self.index_config.get('rescore_factor') or 4
+        self.full_embeddings = None
+        if self.codec is not None:
+            self.full_embeddings = self._load_embeddings(vector_store_path)
+            self.embeddings = np.load(os.path.join(vector_store_path, 'embeddings_codes.npy'), mmap_mode='r')
+        else:
+            self.embeddings = self._load_embeddings(vector_store_path)
+        self.filters = RestaurantFilterIndex(filter_columns)
+        # Hybrid retrieval: BM25 hits for exact dish / restaurant names are fused with the
+        # semantic ranking (reciprocal rank fusion). Stores built before BM25 are semantic only.
+        lexical_path = os.path.join(vector_store_path, 'lexical_index.npz')
+        self.lexical = BM25Index.load(lexical_path) if hybrid and os.path.exists(lexical_path) else None
+        self.rrf_k = rrf_k
+        # Popular queries ("pizza", "biryani") skip the transformer forward pass entirely
+        self.query_cache = LRUCache(max_size=query_cache_size, ttl=query_cache_ttl)
+
+    @property
+    def metadata(self):
+        # Full DataFrame view; only built if a caller really asks for it
+        if self._metadata is None:
+            self._metadata = self.table.to_pandas()
+        return self._metadata
+
+    def _take(self, rows):
+        if self.table is None:
+            return self.metadata.iloc[rows].copy()
+        frame = self.table.take(pa.array(rows, type=pa.int64())).to_pandas()
+        frame.index = pd.Index(rows, dtype='int64')
+        return frame
+
+    @staticmethod
+    def _normalize_query(query):
+        return " ".join(str(query).lower().split())
+
+    def encode_queries(self, queries):
+        # Cache-aware batch encoding: every miss in the batch goes through a single model.encode call
+        keys = [self._normalize_query(q) for q in queries]
+        vectors = {}
+        misses = []
+        for key in keys:
+            if key in vectors:
+                continue
+            cached = self.query_cache.get(key)
+            QUERY_CACHE_LOOKUPS.inc(result='miss' if cached is None else 'hit')
+            if cached is None:
+                vectors[key] = None
+                misses.append(key)
+            else:
+                vectors[key] = cached
+        if misses:
+            with timed('encode'):
+                encoded = np.asarray(self.model.encode(misses), dtype='float32')
+            for key, vector in zip(misses, encoded):
+                vector = vector.reshape(1, -1)
+                vector.setflags(write=False)
+                self.query_cache.set(key, vector)
+                vectors[key] = vector
+        return np.vstack([vectors[key] for key in keys])
+
+    def encode_query(self, query):
+        return self.encode_queries([query])
+
+    @staticmethod
+    def _load_index_config(vector_store_path):
+        config_path = os.path.join(vector_store_path, 'index_config.json')
+        if not os.path.exists(config_path):
+            return {'index_type': 'flat'}
+        with open(config_path) as f:
+            return json.load(f)
+
+    def _load_embeddings(self, vector_store_path):
+        # Row-aligned embedding matrix used to score filtered subsets exactly.
+        # Memory-mapped so it costs nothing until a filtered query touches it.
+        emb_path = os.path.join(vector_store_path, 'embeddings.npy')
+        if os.path.exists(emb_path):
+            return np.load(emb_path, mmap_mode='r')
+        # Older vector stores have no embeddings.npy; a flat index can hand back its vectors
+        try:
+            return self.index.reconstruct_n(0, self.index.ntotal)
+        except RuntimeError:
+            return None
+
+    @staticmethod
+    def _nearest(query_vector, vectors, rows, top_k):
+        distances = ((vectors - query_vector) ** 2).sum(axis=1)
+        if len(distances) > top_k:
+            best = np.argpartition(distances, top_k)[:top_k]
+        else:
+            best = np.arange(len(distances))
+        best = best[np.argsort(distances[best], kind='stable')]
+        return rows[best]
+
+    def _shortlist_size(self, top_k):
+        return top_k * self.rescore_factor if self.codec is not None else top_k
+
+    def _rescore(self, query_vector, rows, top_k):
+        # Re-rank a shortlist found on compressed vectors with the full-precision ones
+        if self.full_embeddings is None:
+            return rows[:top_k]
+        return self._nearest(query_vector, np.asarray(self.full_embeddings[rows], dtype='float32'), rows, top_k)
+
+    def _rank_subset(self, query_vector, candidate_rows, top_k):
+        # Exact L2 ranking over only the rows that passed the hard filters
+        if self.codec is not None:
+            subset = self.codec.decode(self.embeddings[candidate_rows])
+            shortlist = self._nearest(self.codec.project(query_vector), subset, candidate_rows,
+                                      self._shortlist_size(top_k))
+            return self._rescore(query_vector, shortlist, top_k)
+        subset = np.asarray(self.embeddings[candidate_rows], dtype='float32')
+        return self._nearest(query_vector, subset, candidate_rows, top_k)
+
+    def _rank_depth(self, top_k):
+        # Hybrid search fuses deeper lists than the final top_k, so lexical hits can surface
+        return max(4 * top_k, 20) if self.lexical is not None else top_k
+
+    def _fuse(self, query, semantic_rows, candidate_rows, top_k):
+        if self.lexical is None:
+            return semantic_rows[:top_k]
+        with timed('lexical'):
+            lexical_rows = self.lexical.search(query, self._rank_depth(top_k), candidate_rows)
+        return reciprocal_rank_fusion([semantic_rows, lexical_rows], k=self.rrf_k, limit=top_k)
+
+    def _search_index(self, query_vectors, k):
+        # The index holds PCA-reduced vectors when the store was built with a codec
+        if self.codec is not None:
+            query_vectors = self.codec.project(query_vectors)
+        with timed('index_search'):
+            return self.index.search(query_vectors, k)
 
     def search(self, query, top_k=5, location=None, max_price=None, min_rating=0.0):
-        # 1. Start with full metadata
-        filtered_df = self.metadata.copy()
-        
-        # 2. Apply hard filters first (Location, Price, Rating)
+        filters = {'location': location, 'max_price': max_price, 'min_rating': min_rating}
+        return self.search_batch([query], top_k=top_k, filters=[filters])[0]
+
+    def search_batch(self, queries, top_k=5, filters=None):
+        """Search many queries at once, returning one DataFrame per query in input order.
+
+        `filters` is either a single dict of search() keyword filters shared by every query,
+        or a list of such dicts aligned with `queries`.
+        """
+        queries = list(queries)
+        if filters is None or isinstance(filters, dict):
+            filters = [filters or {}] * len(queries)
+        if len(filters) != len(queries):
+            raise ValueError("filters must have one entry per query")
+
+        # 1. Apply hard filters first (Location, Price, Rating) via the prebuilt filter index
         # This ensures we only look at restaurants that actually meet the user's constraints
-        if location and location != "Any":
-            filtered_df = filtered_df[filtered_df['location'].str.contains(location, case=False, na=False)]
-        
-        if max_price:
-            filtered_df = filtered_df[filtered_df['approx_cost_two'] <= max_price]
-            
-        if min_rating:
-            filtered_df = filtered_df[filtered_df['rate_float'] >= min_rating]
-            
-        if filtered_df.empty:
-            return filtered_df # Return empty if no restaurant matches hard constraints
-            
-        # 3. Rank the remaining restaurants by similarity to the query
-        query_vector = self.model.encode([query]).astype('float32')
-        
-        # If the filtered set is small, we calculate similarity manually (very fast for < 50k rows)
+        with timed('filter'):
+            candidates = [self.filters.select(**f) for f in filters]
+        results = [None] * len(queries)
+        to_rank = []
+        for i, candidate_rows in enumerate(candidates):
+            CANDIDATE_SET_SIZE.observe(self.num_rows if candidate_rows is None else len(candidate_rows))
+            if candidate_rows is not None and len(candidate_rows) == 0:
+                EMPTY_RESULTS.inc()
+                results[i] = self._take(candidate_rows) # Return empty if no restaurant matches hard constraints
+            else:
+                to_rank.append(i)
+        if not to_rank:
+            return results
+
+        # 2. Rank the remaining restaurants by similarity to the query (one batched encode)
+        query_vectors = self.encode_queries([queries[i] for i in to_rank])
+        vector_of = dict(zip(to_rank, query_vectors))
+
+        # If filters were applied, rank only the surviving rows so the top_k is exact.
         # If no filters were applied (full dataset), we use the FAISS index for speed
-        if len(filtered_df) < len(self.metadata):
-            # Fallback: Get all embeddings for the filtered subset and calculate distance
-            # For simplicity and speed in this size, we can still use FAISS for the full set 
-            # but we'll take a much larger pool (5000) to ensure we get results.
-            # However, the most robust way is to just use the FAISS index to find global top 5000
-            # and then intersect.
-            search_k = min(5000, len(self.metadata))
-            distances, indices = self.index.search(query_vector, search_k)
-            
-            # Get the top semantic matches
-            top_semantic_indices = indices[0]
-            
-            # Intersection: Keep only those that passed our hard filters
-            results = filtered_df.loc[filtered_df.index.isin(top_semantic_indices)].copy()
-            
-            # If intersection is empty, it means the user's specific craving isn't in the top 5000 
-            # global matches for that query, but we still want to show the BEST of the filtered set.
-            if results.empty:
-                # In this case, just return the top restaurants by rating in that location
-                return filtered_df.sort_values(by='rate_float', ascending=False).head(top_k)
-            
-            return results.head(top_k)
-        else:
-            # Standard fast FAISS search for no filters
-            distances, indices = self.index.search(query_vector, top_k)
-            return self.metadata.iloc[indices[0]].copy()
+        depth = self._rank_depth(top_k)
+        unfiltered, pooled = [], []
+        for i in to_rank:
+            candidate_rows = candidates[i]
+            if candidate_rows is None or len(candidate_rows) == self.num_rows:
+                unfiltered.append(i)
+            elif self.embeddings is not None:
+                with timed('rank_subset'):
+                    top_rows = self._rank_subset(vector_of[i], candidate_rows, depth)
+                results[i] = self._take(self._fuse(queries[i], top_rows, candidate_rows, top_k))
+            else:
+                pooled.append(i)
+
+        if unfiltered:
+            # Standard fast FAISS search for no filters, one call for the whole batch
+            distances, indices = self._search_index(np.vstack([vector_of[i] for i in unfiltered]),
+                                                    min(self._shortlist_size(depth), self.num_rows))
+            for i, row_ids in zip(unfiltered, indices):
+                row_ids = row_ids[row_ids >= 0]
+                if self.codec is not None:
+                    row_ids = self._rescore(vector_of[i], row_ids, depth)
+                results[i] = self._take(self._fuse(queries[i], row_ids, None, top_k))
+
+        if pooled:
+            # Without stored embeddings we can only take a large global pool (5000)
+            # from FAISS and intersect it with the filtered set.
+            search_k = min(5000, self.num_rows)
+            distances, indices = self._search_index(np.vstack([vector_of[i] for i in pooled]), search_k)
+            for i, row_ids in zip(pooled, indices):
+                candidate_rows = candidates[i]
+                # Intersection: keep the hard-filter survivors in similarity order
+                ranked = row_ids[(row_ids >= 0) & np.isin(row_ids, candidate_rows)]
+                ranked = self._fuse(queries[i], ranked[:depth], candidate_rows, top_k)
+                # If intersection is empty, it means the user's specific craving isn't in the top 5000 
+                # global matches for that query, but we still want to show the BEST of the filtered set.
+                if len(ranked) == 0:
+                    # In this case, just return the top restaurants by rating in that location
+                    RATING_FALLBACKS.inc()
+                    results[i] = self._take(candidate_rows).sort_values(by='rate_float', ascending=False).head(top_k)
+                else:
+                    results[i] = self._take(ranked[:top_k])
+
+        return results
 
 def test_search():
     if not os.path.exists('vector_store/restaurant_index.faiss'):
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeEncoder:
+    """Deterministic bag-of-words encoder standing in for SentenceTransformer in offline tests."""
+
+    dim = 32
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    def _vector(self, text):
+        vec = np.zeros(self.dim, dtype='float32')
+        for word in str(text).lower().replace(',', ' ').replace('.', ' ').split():
+            bucket = int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim
+            vec[bucket] += 1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, sentences, **kwargs):
+        self.calls += 1
+        return np.vstack([self._vector(s) for s in sentences]).astype('float32')
+
+
+SYNTHETIC_ROWS = [
+    ('Pizza Palace', 'Banashankari', 4.1, 600, 'Italian, Pizza', 'Margherita Pizza'),
+    ('Spice Route', 'Banashankari', 3.8, 400, 'North Indian', 'Butter Chicken, Naan'),
+    ('Dosa Corner', 'Jayanagar', 4.4, 200, 'South Indian', 'Masala Dosa'),
+    ('Biryani House', 'Koramangala 5th Block', 4.0, 700, 'Biryani, Mughlai', 'Chicken Biryani'),
+    ('Truffles', 'Koramangala 7th Block', 4.6, 900, 'Cafe, Burger', 'Burgers, Ghee Roast'),
+    ('Noodle Bar', 'Indiranagar', 3.2, 1200, 'Chinese, Thai', 'Hakka Noodles'),
+    ('Tandoor Nights', 'Banashankari', 3.5, 1500, 'North Indian, Mughlai', 'Paneer Tikka'),
+    ('Slice of Rome', 'Indiranagar', 4.2, 1100, 'Italian, Pizza', 'Pepperoni Pizza'),
+    ('Udupi Grand', 'Jayanagar', 3.9, 300, 'South Indian', 'Filter Coffee, Idli'),
+    ('Kebab Street', 'Koramangala 5th Block', 0.0, 500, 'North Indian, Kebab', ''),
+]
+
+
+def make_metadata(n_copies=1):
+    rows = []
+    for copy in range(n_copies):
+        for name, location, rate, cost, cuisines, liked in SYNTHETIC_ROWS:
+            label = name if copy == 0 else f"{name} {copy}"
+            doc = (f"{label} is a Casual Dining specializing in {cuisines}, located in {location}. "
+                   f"It has a rating of {rate}/5.0. The approximate cost for two people is ₹{cost}. ")
+            if liked:
+                doc += f"Customers particularly liked: {liked}."
+            rows.append({
+                'name': label, 'location': location, 'rate_float': rate,
+                'approx_cost_two': cost, 'cuisines': cuisines, 'dish_liked': liked,
+                'document_string': doc,
+            })
+    return pd.DataFrame(rows)
+
+
+def build_store(path, metadata):
+    import faiss
+    from src.data.artifacts import write_metadata
+
+    embeddings = FakeEncoder().encode(metadata['document_string'].tolist())
+    index = faiss.IndexFlatL2(embeddings.shape[1])
+    index.add(embeddings)
+    os.makedirs(path, exist_ok=True)
+    faiss.write_index(index, os.path.join(path, 'restaurant_index.faiss'))
+    np.save(os.path.join(path, 'embeddings.npy'), embeddings)
+    write_metadata(metadata, os.path.join(path, 'metadata.arrow'))
+    return path
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    import src.vector_db.search as search_module
+    monkeypatch.setattr(search_module, 'sentence_transformer', FakeEncoder)
+    return FakeEncoder
+
+
+@pytest.fixture
+def synthetic_store(tmp_path):
+    return build_store(str(tmp_path / 'vector_store'), make_metadata(n_copies=3))
+
+
+@pytest.fixture
+def processed_data(tmp_path):
+    from src.data.artifacts import write_processed
+
+    data_path = str(tmp_path / 'restaurants_processed.parquet')
+    write_processed(make_metadata(n_copies=30), data_path)
+    return data_path
+
+
+@pytest.fixture
+def fake_ingest_encoder(monkeypatch):
+    import src.vector_db.ingest as ingest_module
+    monkeypatch.setattr(ingest_module, 'sentence_transformer', FakeEncoder)
+    return FakeEncoder
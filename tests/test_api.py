@@ -2,20 +2,28 @@ import pytest
 from fastapi.testclient import TestClient
 import os
 import sys
+import time
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.api.main import app
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def client():
+    # Entering the client runs the lifespan hook; wait for the engine to finish loading
+    with TestClient(app) as client:
+        deadline = time.time() + 300
+        while client.get("/readyz").json()["status"] == "starting" and time.time() < deadline:
+            time.sleep(0.5)
+        yield client
 
-def test_read_root():
+def test_read_root(client):
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to the AI Restaurant Recommendation API"}
 
-def test_recommend_endpoint_logic():
+def test_recommend_endpoint_logic(client):
     payload = {
         "query": "authentic North Indian food",
         "location": "Banashankari",
@@ -27,14 +35,14 @@ def test_recommend_endpoint_logic():
     assert "recommendation" in data
     assert len(data["recommendation"]) > 0
 
-def test_recommend_missing_optional_params():
+def test_recommend_missing_optional_params(client):
     # Only query is required
     payload = {"query": "South Indian"}
     response = client.post("/recommend", json=payload)
     assert response.status_code == 200
     assert "recommendation" in response.json()
 
-def test_recommend_invalid_payload():
+def test_recommend_invalid_payload(client):
     # Missing required 'query'
     payload = {"location": "Bangalore"}
     response = client.post("/recommend", json=payload)
@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+
+from src.api.main import app
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ['torch', 'sentence_transformers', 'faiss', 'groq']
+# Importing the app should cost about as much as importing FastAPI itself
+IMPORT_BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "2.0"))
+
+
+def wait_for(client, path, status, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get(path).status_code == status:
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_import_is_cheap():
+    code = ("import json, sys, time; start = time.perf_counter(); import src.api.main; "
+            "elapsed = time.perf_counter() - start; "
+            f"print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    elapsed, loaded = json.loads(out.stdout.strip().splitlines()[-1])
+    assert loaded == []
+    assert elapsed < IMPORT_BUDGET_S
+
+
+def test_readiness_follows_engine_startup(monkeypatch):
+    release = threading.Event()
+    engine = MagicMock(aclose=AsyncMock())
+    engine.aget_recommendations = AsyncMock(return_value="Try Truffles")
+
+    def slow_factory():
+        release.wait(10)
+        return engine
+
+    monkeypatch.setattr(app.state, 'engine_factory', slow_factory, raising=False)
+    with TestClient(app) as client:
+        assert client.get("/healthz").json() == {"status": "ok"}
+        starting = client.get("/readyz")
+        assert starting.status_code == 503 and starting.json()["status"] == "starting"
+        assert client.post("/recommend", json={"query": "burgers"}).status_code == 503
+
+        release.set()
+        assert wait_for(client, "/readyz", 200)
+        response = client.post("/recommend", json={"query": "burgers"})
+        assert response.json() == {"recommendation": "Try Truffles"}
+
+
+def test_failed_startup_is_reported(monkeypatch):
+    def broken_factory():
+        raise FileNotFoundError("vector_store/restaurant_index.faiss")
+
+    monkeypatch.setattr(app.state, 'engine_factory', broken_factory, raising=False)
+    with TestClient(app) as client:
+        assert wait_for(client, "/readyz", 503)
+        deadline = time.time() + 10
+        while client.get("/readyz").json()["status"] == "starting" and time.time() < deadline:
+            time.sleep(0.02)
+        body = client.get("/readyz").json()
+        assert body["status"] == "failed" and "restaurant_index" in body["detail"]
+        assert client.get("/healthz").status_code == 200
+
+
+def test_engine_warm_up_primes_query_cache(fake_encoder, synthetic_store):
+    from src.llm.recommender import RecommendationEngine
+
+    engine = RecommendationEngine(vector_store_path=synthetic_store)
+    engine.warm_up()
+    assert engine.searcher.query_cache.stats()['size'] == 1
@@ -0,0 +1,71 @@
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.llm.errors import LLMUnavailableError
+
+
+def _frames(body):
+    frames = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        frames.append((fields.get('event', 'message'), json.loads(fields['data'])))
+    return frames
+
+
+@pytest.fixture
+def stream_client(monkeypatch):
+    from src.api.main import app
+
+    engine = MagicMock(aclose=AsyncMock())
+    monkeypatch.setattr(app.state, 'engine_factory', lambda: engine, raising=False)
+    with TestClient(app) as client:
+        while client.get("/readyz").json()["status"] == "starting":
+            time.sleep(0.01)
+        yield client, engine
+
+
+def test_stream_frames_tokens_then_done(stream_client):
+    client, engine = stream_client
+
+    async def tokens(**kwargs):
+        for token in ["Try ", "**Truffles**"]:
+            yield token
+    engine.astream_recommendations = tokens
+
+    response = client.post("/recommend/stream", json={"query": "burgers"})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert _frames(response.text) == [('message', {'token': "Try "}), ('message', {'token': "**Truffles**"}),
+                                      ('done', {})]
+
+
+def test_stream_failure_after_first_token_is_an_error_event(stream_client):
+    client, engine = stream_client
+
+    async def tokens(**kwargs):
+        yield "Try "
+        raise LLMUnavailableError("connection reset")
+    engine.astream_recommendations = tokens
+
+    response = client.post("/recommend/stream", json={"query": "burgers"})
+    assert response.status_code == 200
+    assert _frames(response.text) == [
+        ('message', {'token': "Try "}),
+        ('error', {'detail': "connection reset", 'error': 'LLMUnavailableError'}),
+        ('done', {}),
+    ]
+
+
+def test_ui_streams_llm_tokens_after_retrieval(fake_encoder, synthetic_store):
+    from src.llm.recommender import NO_RESULTS_MESSAGE, RecommendationEngine
+
+    engine = RecommendationEngine(vector_store_path=synthetic_store)
+    engine.llm.stream_recommendation = MagicMock(return_value=iter(["Try ", "Jalsa"]))
+    results = engine.retrieve("pizza", location="Indiranagar")
+    assert not results.empty
+    assert list(engine.stream_answer("pizza", results)) == ["Try ", "Jalsa"]
+    assert list(engine.stream_answer("sushi", engine.retrieve("sushi", location="Pluto"))) == [NO_RESULTS_MESSAGE]
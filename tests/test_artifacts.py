@@ -0,0 +1,34 @@
+import pyarrow.parquet as pq
+
+from conftest import make_metadata
+from src.data.artifacts import (METADATA_SCHEMA, PROCESSED_SCHEMA, open_metadata, read_metadata,
+                                read_processed, write_metadata, write_processed)
+
+
+def test_processed_parquet_has_typed_schema_and_column_projection(tmp_path):
+    path = str(tmp_path / 'processed.parquet')
+    df = make_metadata()
+    df['votes'] = range(len(df))
+    write_processed(df, path)
+
+    schema = pq.read_schema(path)
+    for field in ['name', 'rate_float', 'approx_cost_two', 'document_string']:
+        assert schema.field(field).type == PROCESSED_SCHEMA.field(field).type
+    assert 'votes' in schema.names
+
+    subset = read_processed(path, columns=['name', 'rate_float'])
+    assert list(subset.columns) == ['name', 'rate_float']
+    assert subset['name'].tolist() == df['name'].tolist()
+
+
+def test_metadata_arrow_round_trip_and_mmap(tmp_path):
+    path = str(tmp_path / 'metadata.arrow')
+    df = make_metadata()
+    write_metadata(df, path)
+
+    table = open_metadata(path)
+    assert table.schema.equals(METADATA_SCHEMA)
+    assert table.num_rows == len(df)
+    locations = read_metadata(path, columns=['location'])
+    assert list(locations.columns) == ['location']
+    assert locations['location'].tolist() == df['location'].tolist()
@@ -0,0 +1,31 @@
+import json
+
+from benchmark import bench_api, bench_ingest, bench_search, compare, latency_stats
+
+
+def test_latency_stats():
+    stats = latency_stats(list(range(1, 101)))
+    assert stats['n'] == 100
+    assert stats['p50_ms'] == 50.5
+    assert stats['p95_ms'] < stats['p99_ms'] <= stats['max_ms'] == 100
+
+
+def test_search_benchmark_covers_filter_scenarios(fake_encoder, synthetic_store):
+    report = bench_search(vector_store_path=synthetic_store, repeats=1, mmap=False)
+    assert set(report['scenarios']) == {'none', 'location', 'location_price_rating', 'no_match'}
+    assert report['scenarios']['none']['n'] == 20
+    assert report['peak_rss_mb'] > 0
+    json.dumps(report)
+
+
+def test_ingest_and_api_benchmarks(tmp_path, processed_data, fake_encoder, fake_ingest_encoder, synthetic_store, capsys):
+    ingest = bench_ingest(processed_data, rows=50)
+    assert ingest['docs'] == 50 and ingest['docs_per_s'] > 0
+
+    api = bench_api(vector_store_path=synthetic_store, requests=10)
+    assert api['n'] == 10 and api['p50_ms'] > 0
+
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'ingest': ingest, 'api': api}))
+    compare({'ingest': ingest, 'api': api}, str(baseline))
+    assert "peak RSS" in capsys.readouterr().out
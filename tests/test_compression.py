@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.vector_db.compression import EmbeddingCodec, compression_report
+from src.vector_db.ingest import initialize_vector_db
+from src.vector_db.search import RestaurantSearch
+
+
+def random_embeddings(n=500, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    # Low-rank structure plus noise, like real sentence embeddings
+    basis = rng.normal(size=(8, dim))
+    return (rng.normal(size=(n, 8)) @ basis + 0.05 * rng.normal(size=(n, dim))).astype('float32')
+
+
+@pytest.mark.parametrize("storage,pca_dim", [('float16', None), ('int8', None), ('float32', 16), ('int8', 16)])
+def test_codec_round_trip_and_report(storage, pca_dim, tmp_path):
+    embeddings = random_embeddings()
+    codec = EmbeddingCodec(storage=storage, pca_dim=pca_dim).fit(embeddings)
+    codes = codec.encode(embeddings)
+    assert codes.shape == (500, pca_dim or 32)
+    decoded = codec.decode(codes)
+    np.testing.assert_allclose(decoded, codec.project(embeddings), atol=0.1)
+
+    codec.save(str(tmp_path / 'codec.npz'))
+    loaded = EmbeddingCodec.load(str(tmp_path / 'codec.npz'))
+    np.testing.assert_array_equal(loaded.encode(embeddings), codes)
+
+    report = compression_report(embeddings, codec, codes)
+    assert report['memory_saved'] > 0
+    assert report['recall_at_k_rescored'] >= report['recall_at_k'] - 1e-9
+    assert report['recall_at_k_rescored'] > 0.9
+
+
+def test_float32_without_pca_is_lossless():
+    assert not EmbeddingCodec().lossy
+    with pytest.raises(ValueError):
+        EmbeddingCodec(storage='int4')
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf_flat', 'hnsw'])
+def test_compressed_store_matches_full_precision_search(index_type, tmp_path, processed_data,
+                                                        fake_encoder, fake_ingest_encoder):
+    params = {'flat': {}, 'ivf_flat': {'nlist': 4}, 'hnsw': {'m': 8}}[index_type]
+    full_dir, small_dir = str(tmp_path / 'full'), str(tmp_path / 'small')
+    initialize_vector_db(data_path=processed_data, output_dir=full_dir)
+    initialize_vector_db(data_path=processed_data, output_dir=small_dir, index_type=index_type,
+                         index_params=params, nprobe=4, storage='int8', pca_dim=16, rescore_factor=8)
+
+    with open(os.path.join(small_dir, 'index_config.json')) as f:
+        config = json.load(f)
+    assert config['compression']['compressed_bytes'] * 8 == config['compression']['full_bytes']
+    assert np.load(os.path.join(small_dir, 'embeddings_codes.npy')).dtype == np.uint8
+
+    full = RestaurantSearch(vector_store_path=full_dir, hybrid=False)
+    small = RestaurantSearch(vector_store_path=small_dir, hybrid=False)
+    assert small.codec is not None and full.codec is None
+    for query, filters in [("pizza", {}), ("masala dosa", {'location': 'Jayanagar'}),
+                           ("north indian", {'max_price': 800, 'min_rating': 3.5})]:
+        expected = full.search(query, top_k=5, **filters)
+        got = small.search(query, top_k=5, **filters)
+        # Rescoring puts the shortlist back in exact full-precision order; the synthetic copies
+        # tie on distance, so compare distances rather than names
+        query_vector = full.encode_query(query)
+        distance = lambda rows: ((full.embeddings[rows] - query_vector) ** 2).sum(axis=1)
+        np.testing.assert_allclose(distance(got.index.to_numpy()), distance(expected.index.to_numpy()), atol=1e-5)
+
+
+def test_rebuilding_without_compression_removes_codes(tmp_path, processed_data, fake_ingest_encoder):
+    output_dir = str(tmp_path / 'store')
+    initialize_vector_db(data_path=processed_data, output_dir=output_dir, storage='float16')
+    assert os.path.exists(os.path.join(output_dir, 'codec.npz'))
+    initialize_vector_db(data_path=processed_data, output_dir=output_dir)
+    assert not os.path.exists(os.path.join(output_dir, 'codec.npz'))
+    assert not os.path.exists(os.path.join(output_dir, 'embeddings_codes.npy'))
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from src.llm.context_builder import CONTEXT_HEADER, ContextBuilder, estimate_tokens
+from src.llm.groq_client import GroqService
+from conftest import make_metadata
+
+
+def test_compact_rows_truncate_long_fields():
+    builder = ContextBuilder(max_field_chars=30, top_dishes=2)
+    row = {'name': 'Truffles', 'cuisines': 'Cafe, American, Burger, Steak, Continental, Desserts',
+           'rate_float': 4.6, 'approx_cost_two': 900, 'dish_liked': 'Burgers, Ghee Roast, Fries, Shakes'}
+    line = builder.format_row(1, row)
+    assert line.startswith("1 | Truffles | Cafe, American, Burger, Steak")
+    assert line.endswith("| 4.6/5 | ₹900 | Burgers, Ghee Roast")
+    assert len(line.split(" | ")[2]) <= 30
+
+    unrated = builder.format_row(2, {'name': 'Kebab Street', 'cuisines': 'Kebab', 'rate_float': 0.0,
+                                     'approx_cost_two': 0, 'dish_liked': ''})
+    assert unrated == "2 | Kebab Street | Kebab | new | - | -"
+
+
+def test_dishes_recovered_from_document_string_for_older_stores():
+    metadata = make_metadata().drop(columns=['dish_liked'])
+    context, _, _ = ContextBuilder().build(metadata.head(3))
+    assert "Butter Chicken, Naan" in context
+    assert "Customers particularly liked" not in context
+
+
+def test_budget_limits_rows_and_scales_max_tokens():
+    results = make_metadata(n_copies=3)
+    roomy = ContextBuilder(token_budget=10_000)
+    context, max_tokens, included = roomy.build(results.head(5))
+    assert included == 5 and context.splitlines()[0] == CONTEXT_HEADER
+    assert max_tokens == roomy.base_max_tokens + 5 * roomy.tokens_per_restaurant
+
+    tight = ContextBuilder(token_budget=estimate_tokens(CONTEXT_HEADER) + 40)
+    context, max_tokens, included = tight.build(results.head(5))
+    assert 1 <= included < 5
+    assert estimate_tokens(context) <= tight.token_budget
+    assert max_tokens < roomy.build(results.head(5))[1]
+
+    # The best match is sent even when it alone exceeds the budget
+    assert ContextBuilder(token_budget=1).build(results.head(5))[2] == 1
+
+
+def test_compact_context_is_smaller_than_document_strings():
+    results = make_metadata().head(5)
+    legacy = "".join(f"{i + 1}. {doc}\n" for i, doc in enumerate(results['document_string']))
+    context, _, _ = ContextBuilder().build(results)
+    assert estimate_tokens(context) < 0.7 * estimate_tokens(legacy)
+
+
+def test_max_tokens_reaches_the_completion_request():
+    service = GroqService(api_key="fake-key")
+    assert service._completion_kwargs("q", "c", max_tokens=330)['max_tokens'] == 330
+    assert service._completion_kwargs("q", "c")['max_tokens'] == 1024
@@ -1,16 +1,22 @@
 import pytest
 import pandas as pd
 import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.artifacts import read_processed
 
 @pytest.fixture
 def processed_df():
-    processed_file = 'processed_data/restaurants_processed.csv'
+    processed_file = 'processed_data/restaurants_processed.parquet'
     if not os.path.exists(processed_file):
         pytest.fail(f"Processed file {processed_file} not found. Run preprocessing first.")
-    return pd.read_csv(processed_file)
+    return read_processed(processed_file)
 
 def test_file_exists():
-    assert os.path.exists('processed_data/restaurants_processed.csv')
+    assert os.path.exists('processed_data/restaurants_processed.parquet')
 
 def test_required_columns(processed_df):
     required_columns = [
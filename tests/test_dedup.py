@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.preprocess import deduplicate_listings
+
+
+def listings():
+    rows = [
+        ('Jalsa', '942, 21st Main Road, Banashankari', 'Banashankari', 'Buffet', 'Banashankari', 775),
+        ('Jalsa', '942, 21st Main Road, Banashankari', 'Banashankari', 'Delivery', 'Banashankari', 780),
+        ('jalsa ', '942,  21st Main Road, Banashankari', 'Banashankari', 'Dine-out', 'Basavanagudi', 790),
+        ('Jalsa', '12, MG Road', 'MG Road', 'Delivery', 'MG Road', 50),
+        ('Spice Elephant', None, 'Banashankari', 'Buffet', 'Banashankari', 787),
+        ('Spice Elephant', None, 'Banashankari', 'Buffet', 'Jayanagar', 787),
+        ('San Churro Cafe', '1112, Next to KIMS', 'Banashankari', 'Cafes', 'Banashankari', 918),
+    ]
+    return pd.DataFrame(rows, columns=['name', 'address', 'location', 'listed_in(type)', 'listed_in(city)', 'votes'])
+
+
+def test_duplicates_collapse_into_canonical_records():
+    deduped, mapping = deduplicate_listings(listings())
+    assert deduped['name'].tolist() == ['jalsa ', 'Jalsa', 'Spice Elephant', 'San Churro Cafe']
+    # The most-voted listing is kept; all sections are merged onto it
+    assert deduped.loc[0, 'votes'] == 790
+    assert deduped.loc[0, 'listed_in_types'] == 'Buffet, Delivery, Dine-out'
+    assert deduped.loc[0, 'listed_in_cities'] == 'Banashankari, Basavanagudi'
+    assert deduped.loc[2, 'listed_in_types'] == 'Buffet'
+    assert deduped.loc[2, 'listed_in_cities'] == 'Banashankari, Jayanagar'
+
+
+def test_mapping_covers_every_source_row():
+    raw = listings()
+    deduped, mapping = deduplicate_listings(raw)
+    assert mapping['source_row'].tolist() == list(range(len(raw)))
+    assert mapping['canonical_row'].tolist() == [0, 0, 0, 1, 2, 2, 3]
+    assert mapping['canonical_row'].max() == len(deduped) - 1
+
+
+def test_mapping_is_written_with_a_typed_schema(tmp_path):
+    import pyarrow.parquet as pq
+    from src.data.artifacts import DEDUP_MAPPING_SCHEMA, write_dedup_mapping
+
+    _, mapping = deduplicate_listings(listings())
+    path = str(tmp_path / 'processed' / 'dedup_mapping.parquet')
+    write_dedup_mapping(mapping, path)
+    assert pq.read_schema(path).equals(DEDUP_MAPPING_SCHEMA)
+    assert pd.read_parquet(path)['canonical_row'].tolist() == [0, 0, 0, 1, 2, 2, 3]
+    assert os.listdir(tmp_path / 'processed') == ['dedup_mapping.parquet']
@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import FakeEncoder, make_metadata
+from src.vector_db.embedders import (OnnxEmbedder, benchmark_embedder, load_embedder, parity_check,
+                                     save_embedder_config)
+
+VOCAB = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + (
+    "pizza dosa ghee roast biryani north south indian spicy food in the a is cafe burgers "
+    "chicken masala italian chinese noodles rating cost for two people").split()
+
+
+@pytest.fixture
+def tiny_sentence_transformer(tmp_path):
+    # A randomly initialised two-layer BERT built locally, so the test needs no model download
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.sentence_transformer.modules import Normalize, Pooling, Transformer
+
+    model_dir = str(tmp_path / 'tiny_bert')
+    os.makedirs(model_dir)
+    with open(os.path.join(model_dir, 'vocab.txt'), 'w') as f:
+        f.write('\n'.join(VOCAB))
+    BertTokenizerFast(vocab_file=os.path.join(model_dir, 'vocab.txt')).save_pretrained(model_dir)
+    config = BertConfig(vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=2, num_attention_heads=4,
+                        intermediate_size=64, max_position_embeddings=64)
+    BertModel(config).save_pretrained(model_dir)
+    return SentenceTransformer(modules=[Transformer(model_dir, max_seq_length=48), Pooling(32, 'mean'), Normalize()],
+                               device='cpu')
+
+
+class TorchSession:
+    """Stands in for an onnxruntime session by running the same transformer in torch."""
+
+    def __init__(self, transformer):
+        self.transformer = transformer.eval()
+
+    def get_inputs(self):
+        class Node:
+            def __init__(self, name):
+                self.name = name
+        return [Node('input_ids'), Node('attention_mask'), Node('token_type_ids')]
+
+    def run(self, output_names, feeds):
+        import torch
+        with torch.no_grad():
+            tensors = {name: torch.from_numpy(value) for name, value in feeds.items()}
+            return [self.transformer(**tensors).last_hidden_state.numpy()]
+
+
+def sentences():
+    return make_metadata()['document_string'].tolist()
+
+
+def test_onnx_pipeline_matches_sentence_transformer(tiny_sentence_transformer, tmp_path, monkeypatch):
+    # Tokenisation, padding, mean pooling and normalisation must reproduce st.encode() exactly;
+    # the graph itself is swapped for the torch module
+    model_dir = str(tmp_path / 'onnx')
+    save_embedder_config(tiny_sentence_transformer, 'tiny', model_dir)
+    open(os.path.join(model_dir, 'model.onnx'), 'w').close()
+    transformer = tiny_sentence_transformer[0].auto_model
+    monkeypatch.setattr(OnnxEmbedder, '_open_session', staticmethod(lambda path, threads=None: TorchSession(transformer)))
+
+    embedder = OnnxEmbedder('tiny', model_dir=model_dir)
+    parity = parity_check(tiny_sentence_transformer, embedder, sentences())
+    assert parity['min_cosine'] > 0.9999
+    # Batching pads to the longest sentence in the batch; the mask keeps padding out of the mean
+    np.testing.assert_allclose(embedder.encode(sentences(), batch_size=3), embedder.encode(sentences()), atol=1e-5)
+
+
+def test_exported_onnx_parity(tiny_sentence_transformer, tmp_path, monkeypatch):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    import src.vector_db.embedders as embedders
+
+    model_dir = str(tmp_path / 'onnx')
+    monkeypatch.setattr('sentence_transformers.SentenceTransformer', lambda *a, **k: tiny_sentence_transformer)
+    embedders.export_onnx('tiny', model_dir, quantize=True)
+    fp32 = OnnxEmbedder('tiny', model_dir=model_dir)
+    int8 = OnnxEmbedder('tiny', model_dir=model_dir, quantized=True)
+    assert parity_check(tiny_sentence_transformer, fp32, sentences())['min_cosine'] > 0.9999
+    assert parity_check(tiny_sentence_transformer, int8, sentences())['mean_cosine'] > 0.95
+
+
+def test_serving_refuses_to_export_implicitly(tmp_path):
+    with pytest.raises(FileNotFoundError, match="--export"):
+        OnnxEmbedder('tiny', model_dir=str(tmp_path / 'missing'))
+    with pytest.raises(FileNotFoundError, match="model_int8.onnx"):
+        os.makedirs(tmp_path / 'fp32_only')
+        (tmp_path / 'fp32_only' / 'embedder_config.json').write_text('{}')
+        (tmp_path / 'fp32_only' / 'model.onnx').write_text('')
+        OnnxEmbedder('tiny', model_dir=str(tmp_path / 'fp32_only'), quantized=True)
+
+
+def test_benchmark_and_backend_selection():
+    report = benchmark_embedder(FakeEncoder(), sentences() * 5, batch_size=8, repeats=1)
+    assert set(report) == {'query_p50_ms', 'query_p95_ms', 'batch_docs_per_s'}
+    assert report['batch_docs_per_s'] > 0
+    with pytest.raises(ValueError):
+        load_embedder('tensorrt')
+
+
+def test_searcher_encodes_queries_with_the_store_model_and_backend(synthetic_store, monkeypatch):
+    import json
+    import src.vector_db.search as search_module
+
+    with open(os.path.join(synthetic_store, 'index_config.json'), 'w') as f:
+        json.dump({'index_type': 'flat', 'model_name': 'tiny-encoder', 'embedding_backend': 'onnx'}, f)
+    loaded = []
+    monkeypatch.setattr(search_module, 'load_embedder',
+                        lambda backend, model_name: loaded.append((backend, model_name)) or FakeEncoder())
+    monkeypatch.delenv('EMBEDDING_BACKEND', raising=False)
+    searcher = search_module.RestaurantSearch(vector_store_path=synthetic_store)
+    assert loaded == [('onnx', 'tiny-encoder')]
+    assert not searcher.search("dosa", top_k=2).empty
+
+    # An explicit backend still overrides the store's
+    monkeypatch.setattr(search_module, 'sentence_transformer',
+                        lambda model_name: loaded.append(model_name) or FakeEncoder())
+    search_module.RestaurantSearch(vector_store_path=synthetic_store, embedding_backend='torch')
+    assert loaded[-1] == 'tiny-encoder'
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from loadtest import run_load, summarize
+from src.llm.errors import LLMRateLimitError
+from src.llm.fake_groq import FakeGroqSettings, create_fake_groq_app
+from src.llm.groq_client import GroqService
+from src.llm.resilience import ResilientCaller, RetryPolicy
+from src.llm.response_cache import ResponseCache
+
+
+def fast_settings(**overrides):
+    options = dict(latency_ms=5, latency_dist='fixed', tokens_per_s=5000, completion_tokens=20, seed=0)
+    options.update(overrides)
+    return FakeGroqSettings(**options)
+
+
+def service_for(app):
+    return GroqService(api_key="fake-key", cache=ResponseCache(max_size=0), base_url="http://testserver",
+                       http_client=TestClient(app),
+                       async_http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)))
+
+
+def test_groq_service_against_fake_server():
+    app = create_fake_groq_app(fast_settings())
+    service = service_for(app)
+
+    text = service.generate_recommendation("burgers", "1. Truffles")
+    assert len(text.split()) == 20
+    streamed = list(service.stream_recommendation("burgers", "1. Truffles"))
+    assert len(streamed) == 20 and "".join(streamed) == text
+
+    async def run_async():
+        tokens = [t async for t in service.astream_recommendation("dosa", "1. Dosa Corner")]
+        return await service.agenerate_recommendation("dosa", "1. Dosa Corner"), tokens
+    async_text, tokens = asyncio.run(run_async())
+    assert async_text == text and "".join(tokens) == text
+    assert app.state.counts == {'requests': 4, '429': 0, '5xx': 0, 'ok': 4}
+
+
+def test_injected_errors_surface_through_the_service():
+    app = create_fake_groq_app(fast_settings(rate_429=1.0))
+    service = service_for(app)
+    delays = []
+    service.caller = ResilientCaller(retry=RetryPolicy(max_attempts=3), sleep=delays.append)
+    with pytest.raises(LLMRateLimitError) as raised:
+        service.generate_recommendation("burgers", "ctx")
+    assert raised.value.retry_after == 1
+    # Retried twice, each time waiting at least the Retry-After the server sent
+    assert app.state.counts['429'] == 3 and len(delays) == 2 and min(delays) >= 1
+    response = TestClient(app).post("/openai/v1/chat/completions", json={'messages': []})
+    assert response.status_code == 429 and response.headers['retry-after'] == '1'
+
+
+def test_latency_distributions_have_the_requested_median():
+    for dist in ('fixed', 'uniform', 'lognormal'):
+        settings = FakeGroqSettings(latency_ms=200, latency_dist=dist, seed=1)
+        samples = sorted(settings.first_token_delay() for _ in range(2001))
+        assert samples[1000] == pytest.approx(0.2, rel=0.1)
+    with pytest.raises(ValueError):
+        FakeGroqSettings(latency_dist='pareto')
+
+
+def test_load_harness_reports_throughput_and_errors():
+    app = create_fake_groq_app(fast_settings(rate_429=0.2, rate_5xx=0.1))
+
+    async def drive():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+            return await run_load(client, path='/openai/v1/chat/completions', rps=200, duration_s=0.5,
+                                  payload_fn=lambda i: {'messages': [{'role': 'user', 'content': 'hi'}]})
+
+    results, elapsed = asyncio.run(drive())
+    summary = summarize(results, elapsed, 200)
+    assert summary['requests'] == 100
+    assert 0.1 < summary['error_rate'] < 0.5
+    assert summary['latency']['p99_ms'] >= summary['latency']['p50_ms'] > 0
+    assert summary['throughput_rps'] > 0
+
+
+def test_load_harness_against_api_with_fake_llm(fake_encoder, synthetic_store, monkeypatch):
+    from src.api.main import app as api_app
+    from src.llm.recommender import RecommendationEngine
+
+    fake = create_fake_groq_app(fast_settings())
+
+    def factory():
+        engine = RecommendationEngine(vector_store_path=synthetic_store)
+        engine.llm = service_for(fake)
+        return engine
+
+    monkeypatch.setattr(api_app.state, 'engine_factory', factory, raising=False)
+
+    async def drive():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api_app), base_url="http://testserver") as client:
+            return await run_load(client, rps=50, duration_s=0.4)
+
+    with TestClient(api_app) as client:
+        while client.get("/readyz").json()["status"] == "starting":
+            time.sleep(0.02)
+        results, elapsed = asyncio.run(drive())
+    summary = summarize(results, elapsed, 50)
+    assert summary['requests'] == 20 and summary['error_rate'] == 0.0
+    assert fake.state.counts['requests'] == 20
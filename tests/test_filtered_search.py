@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import FakeEncoder
+from src.vector_db.search import RestaurantSearch
+
+
+@pytest.fixture
+def searcher(fake_encoder, synthetic_store):
+    return RestaurantSearch(vector_store_path=synthetic_store)
+
+
+def brute_force(searcher, query, mask, top_k):
+    q = FakeEncoder().encode([query])[0]
+    emb = np.asarray(searcher.embeddings)
+    rows = np.flatnonzero(mask)
+    dist = ((emb[rows] - q) ** 2).sum(axis=1)
+    return rows[np.argsort(dist, kind='stable')[:top_k]]
+
+
+def test_filtered_results_are_exact_and_ranked(searcher):
+    meta = searcher.metadata
+    mask = (meta['location'].str.contains('Banashankari') & (meta['approx_cost_two'] <= 1000)).values
+    results = searcher.search("North Indian butter chicken", top_k=4, location="Banashankari", max_price=1000)
+    expected = brute_force(searcher, "North Indian butter chicken", mask, 4)
+    assert list(results.index) == list(meta.index[expected])
+
+
+def test_filtered_search_never_falls_back_to_rating_sort(searcher):
+    # A query unrelated to the only matching rows must still rank those rows by similarity
+    results = searcher.search("sushi omakase", top_k=2, location="Jayanagar", min_rating=4.3)
+    assert len(results) > 0
+    assert (results['location'] == 'Jayanagar').all()
+    assert (results['rate_float'] >= 4.3).all()
+
+
+def test_filtered_search_without_embeddings_file(fake_encoder, synthetic_store):
+    # Older stores have no embeddings.npy; vectors are recovered from the flat index
+    os.remove(os.path.join(synthetic_store, 'embeddings.npy'))
+    searcher = RestaurantSearch(vector_store_path=synthetic_store)
+    assert searcher.embeddings is not None
+    results = searcher.search("pizza", top_k=3, location="Indiranagar")
+    assert (results['location'] == 'Indiranagar').all()
+    assert 'pizza' in results.iloc[0]['document_string'].lower()
+
+
+def test_filter_index_matches_pandas_masks(searcher):
+    meta = searcher.metadata
+    cases = [
+        dict(location="koramangala"),
+        dict(max_price=600),
+        dict(min_rating=4.0),
+        dict(location="Banashankari", max_price=1000, min_rating=3.6),
+        dict(location="Pluto Planet", max_price=1000),
+        dict(location="Any", max_price=None, min_rating=0.0),
+    ]
+    for case in cases:
+        mask = np.ones(len(meta), dtype=bool)
+        if case.get('location') and case['location'] != "Any":
+            mask &= meta['location'].str.contains(case['location'], case=False).values
+        if case.get('max_price'):
+            mask &= (meta['approx_cost_two'] <= case['max_price']).values
+        if case.get('min_rating'):
+            mask &= (meta['rate_float'] >= case['min_rating']).values
+        rows = searcher.filters.select(**case)
+        if mask.all():
+            assert rows is None
+        else:
+            assert list(rows) == list(np.flatnonzero(mask)), case
+
+
+def test_no_match_returns_empty_frame(searcher):
+    results = searcher.search("pizza", location="Pluto Planet")
+    assert results.empty
+    assert 'document_string' in results.columns
+
+
+def test_mmap_mode_matches_in_memory_results(fake_encoder, synthetic_store, searcher):
+    mapped = RestaurantSearch(vector_store_path=synthetic_store, mmap=True)
+    assert mapped.table is not None
+    assert mapped._metadata is None
+    assert mapped.locations == searcher.locations
+    for kwargs in [{}, {'location': 'Banashankari'}, {'max_price': 700, 'min_rating': 4.0}]:
+        expected = searcher.search("pizza", top_k=4, **kwargs)
+        got = mapped.search("pizza", top_k=4, **kwargs)
+        assert list(got.index) == list(expected.index)
+        assert got['name'].tolist() == expected['name'].tolist()
+    # Results are built row by row; the full frame is never materialised
+    assert mapped._metadata is None
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.vector_db.ingest import initialize_vector_db
+from src.vector_db.lexical import BM25Index, reciprocal_rank_fusion, tokenize
+from src.vector_db.search import RestaurantSearch
+
+
+@pytest.fixture
+def hybrid_store(tmp_path, processed_data, fake_ingest_encoder):
+    output_dir = str(tmp_path / 'store')
+    initialize_vector_db(data_path=processed_data, output_dir=output_dir)
+    return output_dir
+
+
+def test_bm25_ranks_exact_term_matches(tmp_path):
+    texts = ["Masala Dosa and filter coffee", "Ghee Roast, Burgers", "Chicken Biryani", "Ghee rice"]
+    index = BM25Index.build(texts)
+    assert tokenize("Ghee-Roast!") == ['ghee', 'roast']
+    assert list(index.search("ghee roast", k=5)) == [1, 3]
+    assert list(index.search("ghee roast", k=5, candidate_rows=np.array([2, 3]))) == [3]
+    assert len(index.search("sushi", k=5)) == 0
+
+    index.save(str(tmp_path / 'bm25.npz'))
+    loaded = BM25Index.load(str(tmp_path / 'bm25.npz'))
+    np.testing.assert_allclose(loaded.scores("ghee roast"), index.scores("ghee roast"))
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60)
+    # Row 3 appears in both lists, so it beats rows seen only once
+    assert fused[0] == 3
+    assert set(fused) == {1, 2, 3, 4}
+    assert list(reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60, limit=2)) == [3, 1]
+
+
+def test_exact_restaurant_name_is_retrieved(hybrid_store, fake_encoder):
+    semantic = RestaurantSearch(vector_store_path=hybrid_store, hybrid=False)
+    hybrid = RestaurantSearch(vector_store_path=hybrid_store)
+    assert semantic.lexical is None and hybrid.lexical is not None
+
+    # The toy encoder has no idea what "Truffles" means; the lexical list brings the exact name in
+    assert 'Truffles 17' not in semantic.search("Truffles 17", top_k=5)['name'].tolist()
+    assert 'Truffles 17' in hybrid.search("Truffles 17", top_k=3)['name'].tolist()
+
+    dish = hybrid.search("ghee roast", top_k=5, location="Koramangala")
+    assert (dish['name'].str.startswith('Truffles')).all()
+    assert dish['location'].str.contains('Koramangala').all()
+
+
+def test_hybrid_respects_filters(hybrid_store, fake_encoder):
+    searcher = RestaurantSearch(vector_store_path=hybrid_store)
+    results = searcher.search("pizza", top_k=5, max_price=800, min_rating=4.0)
+    assert len(results) == 5
+    assert (results['approx_cost_two'] <= 800).all()
+    assert (results['rate_float'] >= 4.0).all()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from conftest import FakeEncoder, make_metadata
+from src.data.artifacts import read_processed, write_processed
+from src.vector_db.embedding_cache import EmbeddingCache
+from src.vector_db.ingest import initialize_vector_db
+
+
+class CountingEncoder(FakeEncoder):
+    encoded = []
+
+    def encode(self, sentences, **kwargs):
+        CountingEncoder.encoded.append(len(sentences))
+        return super().encode(sentences, **kwargs)
+
+
+def test_only_new_or_changed_documents_are_encoded(tmp_path, monkeypatch):
+    import src.vector_db.ingest as ingest_module
+    monkeypatch.setattr(ingest_module, 'sentence_transformer', CountingEncoder)
+    CountingEncoder.encoded = []
+
+    data_path = str(tmp_path / 'restaurants.parquet')
+    output_dir = str(tmp_path / 'store')
+    df = make_metadata(n_copies=2)
+    write_processed(df, data_path)
+    initialize_vector_db(data_path=data_path, output_dir=output_dir)
+    assert CountingEncoder.encoded == [len(df)]
+
+    # Unchanged rerun: the model is not even loaded
+    initialize_vector_db(data_path=data_path, output_dir=output_dir)
+    assert CountingEncoder.encoded == [len(df)]
+
+    # One changed row, two deleted rows
+    changed = df.drop(index=[0, 1]).reset_index(drop=True)
+    changed.loc[0, 'document_string'] += " Now serving brunch."
+    write_processed(changed, data_path)
+    initialize_vector_db(data_path=data_path, output_dir=output_dir)
+    assert CountingEncoder.encoded == [len(df), 1]
+
+    embeddings = np.load(f"{output_dir}/embeddings.npy")
+    expected = FakeEncoder().encode(read_processed(data_path)['document_string'].tolist())
+    np.testing.assert_allclose(embeddings, expected)
+    assert len(EmbeddingCache(f"{output_dir}/embedding_cache.npz")) == len(set(changed['document_string']))
@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from src.vector_db.index_types import INDEX_TYPES, build_index, default_nprobe, default_pq_m
+from src.vector_db.ingest import initialize_vector_db
+from src.vector_db.search import RestaurantSearch
+
+INDEX_PARAMS = {
+    'flat': {},
+    'ivf_flat': {'nlist': 4},
+    'hnsw': {'m': 8},
+    'ivf_pq': {'nlist': 4, 'pq_m': 8, 'nbits': 4},
+}
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_ingest_and_search_each_index_type(index_type, tmp_path, processed_data,
+                                           fake_encoder, fake_ingest_encoder):
+    output_dir = str(tmp_path / f'store_{index_type}')
+    initialize_vector_db(data_path=processed_data, output_dir=output_dir, index_type=index_type,
+                         index_params=INDEX_PARAMS[index_type], nprobe=4, ef_search=32)
+
+    with open(os.path.join(output_dir, 'index_config.json')) as f:
+        config = json.load(f)
+    assert config['index_type'] == index_type
+    assert 0.0 <= config['report']['recall_at_k'] <= 1.0
+
+    searcher = RestaurantSearch(vector_store_path=output_dir)
+    assert searcher.index_config['index_type'] == index_type
+    results = searcher.search("pizza", top_k=3)
+    assert len(results) == 3
+    filtered = searcher.search("pizza", top_k=3, location="Indiranagar")
+    assert (filtered['location'] == 'Indiranagar').all()
+
+
+def test_exhaustive_ivf_probe_matches_exact(tmp_path, processed_data, fake_ingest_encoder):
+    output_dir = str(tmp_path / 'store')
+    initialize_vector_db(data_path=processed_data, output_dir=output_dir, index_type='ivf_flat',
+                         index_params={'nlist': 4}, nprobe=4)
+    with open(os.path.join(output_dir, 'index_config.json')) as f:
+        assert json.load(f)['report']['recall_at_k'] == pytest.approx(1.0)
+
+
+def test_unknown_index_type_is_rejected(tmp_path, processed_data, fake_ingest_encoder):
+    with pytest.raises(ValueError):
+        initialize_vector_db(data_path=processed_data, output_dir=str(tmp_path / 'store'), index_type='lsh')
+
+
+def test_ivf_nprobe_default_is_persisted_and_served(tmp_path, processed_data, fake_encoder, fake_ingest_encoder):
+    import faiss
+
+    output_dir = str(tmp_path / 'store')
+    initialize_vector_db(data_path=processed_data, output_dir=output_dir, index_type='ivf_flat',
+                         index_params={'nlist': 64})
+    with open(os.path.join(output_dir, 'index_config.json')) as f:
+        assert json.load(f)['nprobe'] == default_nprobe(64) == 8
+    searcher = RestaurantSearch(vector_store_path=output_dir)
+    assert faiss.extract_index_ivf(searcher.index).nprobe == 8
+
+
+def test_pq_m_defaults_to_a_divisor_of_the_dimension():
+    import numpy as np
+
+    assert default_pq_m(384) == 48 and default_pq_m(128) == 32 and default_pq_m(32) == 32
+    vectors = np.random.default_rng(0).standard_normal((400, 128)).astype('float32')
+    index = build_index(vectors, index_type='ivf_pq', nlist=4, nbits=4)
+    assert index.pq.M == 32
+
+
+def test_search_does_not_import_the_ingest_module():
+    import subprocess
+    import sys
+
+    code = "import sys, src.vector_db.search; print('src.vector_db.ingest' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.join(os.path.dirname(__file__), '..'))
+    assert out.stdout.strip() == 'False'
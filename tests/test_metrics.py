@@ -0,0 +1,83 @@
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from src.llm.fake_groq import FakeGroqSettings, create_fake_groq_app
+from src.llm.groq_client import LLM_TOKENS, GroqService
+from src.llm.response_cache import ResponseCache
+from src.metrics import Counter, Histogram, server_timing_header, start_request_timings, timed
+from src.vector_db.search import CANDIDATE_SET_SIZE, EMPTY_RESULTS, RestaurantSearch
+
+
+def test_prometheus_text_format():
+    requests = Counter('demo_requests', "Demo requests", ['outcome'])
+    requests.inc(outcome='ok')
+    requests.inc(2, outcome='error')
+    assert requests.render() == ['demo_requests_total{outcome="error"} 2', 'demo_requests_total{outcome="ok"} 1']
+
+    latency = Histogram('demo_seconds', "Demo latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+    assert latency.render() == [
+        'demo_seconds_bucket{le="0.1"} 1',
+        'demo_seconds_bucket{le="1.0"} 2',
+        'demo_seconds_bucket{le="+Inf"} 3',
+        'demo_seconds_sum 5.55',
+        'demo_seconds_count 3',
+    ]
+
+
+def test_timed_collects_per_request_stages():
+    timings = start_request_timings()
+    with timed('encode'):
+        time.sleep(0.01)
+    with timed('encode'):
+        pass
+    assert set(timings) == {'encode'} and timings['encode'] >= 0.01
+    assert server_timing_header({'encode': 0.0123}) == "encode;dur=12.30"
+
+
+def test_search_counters(fake_encoder, synthetic_store):
+    searcher = RestaurantSearch(vector_store_path=synthetic_store)
+    empty_before, sizes_before = EMPTY_RESULTS.value(), CANDIDATE_SET_SIZE.count()
+    searcher.search("pizza", location="Nowhere")
+    searcher.search("pizza", location="Jayanagar")
+    assert EMPTY_RESULTS.value() == empty_before + 1
+    assert CANDIDATE_SET_SIZE.count() == sizes_before + 2
+
+
+def test_metrics_route_and_server_timing(fake_encoder, synthetic_store, monkeypatch):
+    from src.api.main import app
+    from src.llm.recommender import RecommendationEngine
+
+    fake = create_fake_groq_app(FakeGroqSettings(latency_ms=5, latency_dist='fixed', tokens_per_s=5000,
+                                                 completion_tokens=10))
+
+    def factory():
+        engine = RecommendationEngine(vector_store_path=synthetic_store)
+        engine.llm = GroqService(api_key="fake-key", cache=ResponseCache(max_size=0), base_url="http://testserver",
+                                 http_client=TestClient(fake),
+                                 async_http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake)))
+        return engine
+
+    monkeypatch.setattr(app.state, 'engine_factory', factory, raising=False)
+    completion_before = LLM_TOKENS.value(kind='completion')
+    with TestClient(app) as client:
+        while client.get("/readyz").json()["status"] == "starting":
+            time.sleep(0.02)
+        response = client.post("/recommend", json={"query": "cheap pizza", "max_price": 800})
+        assert response.status_code == 200
+        stages = {part.split(';')[0].strip() for part in response.headers['Server-Timing'].split(',')}
+        assert {'filter', 'encode', 'rank_subset', 'context', 'llm', 'total'} <= stages
+
+        body = client.get("/metrics").text
+    assert LLM_TOKENS.value(kind='completion') == completion_before + 10
+    for line in ('# TYPE restaurant_stage_duration_seconds histogram',
+                 'restaurant_stage_duration_seconds_count{stage="llm"}',
+                 'restaurant_candidate_set_size_bucket',
+                 'restaurant_query_cache_lookups_total{result="miss"}',
+                 'restaurant_llm_cache_lookups_total{result="miss"}',
+                 'restaurant_llm_tokens_total{kind="prompt"}',
+                 'restaurant_http_request_duration_seconds_count{method="POST",path="/recommend",status="200"}'):
+        assert line in body
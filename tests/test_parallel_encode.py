@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import FakeEncoder, make_metadata
+from src.vector_db.parallel_encode import encode_in_chunks
+
+
+class FlakyEncoder(FakeEncoder):
+    """Fails on the Nth encode call of the process, to simulate a crash mid-run."""
+
+    fail_on = None
+    chunks_encoded = 0
+
+    def encode(self, sentences, **kwargs):
+        FlakyEncoder.chunks_encoded += 1
+        if FlakyEncoder.chunks_encoded == FlakyEncoder.fail_on:
+            raise RuntimeError("simulated crash")
+        return super().encode(sentences, **kwargs)
+
+
+def sentences():
+    return make_metadata(n_copies=5)['document_string'].tolist()
+
+
+def test_process_pool_matches_single_process(tmp_path):
+    docs = sentences()
+    expected = FakeEncoder().encode(docs)
+    got = encode_in_chunks(docs, 'fake', FakeEncoder, workers=2, chunk_size=7,
+                           checkpoint_dir=str(tmp_path / 'chunks'))
+    np.testing.assert_allclose(got, expected)
+    # Checkpoints are cleaned up after a complete run
+    assert not os.path.exists(tmp_path / 'chunks')
+
+
+def test_interrupted_run_resumes_from_checkpoints(tmp_path):
+    docs = sentences()
+    checkpoint_dir = str(tmp_path / 'chunks')
+    FlakyEncoder.fail_on, FlakyEncoder.chunks_encoded = 4, 0
+    with pytest.raises(RuntimeError):
+        encode_in_chunks(docs, 'fake', FlakyEncoder, workers=1, chunk_size=10, checkpoint_dir=checkpoint_dir)
+    assert len(os.listdir(checkpoint_dir)) == 3
+
+    FlakyEncoder.fail_on, FlakyEncoder.chunks_encoded = None, 0
+    got = encode_in_chunks(docs, 'fake', FlakyEncoder, workers=1, chunk_size=10, checkpoint_dir=checkpoint_dir)
+    assert FlakyEncoder.chunks_encoded == 2
+    np.testing.assert_allclose(got, FakeEncoder().encode(docs))
+
+
+def test_chunked_ingest(tmp_path, processed_data, fake_ingest_encoder):
+    from src.vector_db.ingest import initialize_vector_db
+
+    output_dir = str(tmp_path / 'store')
+    initialize_vector_db(data_path=processed_data, output_dir=output_dir, workers=2, chunk_size=64)
+    embeddings = np.load(os.path.join(output_dir, 'embeddings.npy'))
+    assert embeddings.shape == (300, FakeEncoder.dim)
+
+
+def test_single_worker_leaves_torch_threads_alone(tmp_path):
+    torch = pytest.importorskip('torch')
+    before = torch.get_num_threads()
+    torch.set_num_threads(max(1, before - 1))
+    try:
+        encode_in_chunks(sentences(), 'fake', FakeEncoder, workers=1, chunk_size=10,
+                         checkpoint_dir=str(tmp_path / 'chunks'))
+        assert torch.get_num_threads() == max(1, before - 1)
+    finally:
+        torch.set_num_threads(before)
@@ -5,8 +5,10 @@ import sys
 # Add src to path if needed
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.data.artifacts import read_processed
+
 def test_preprocessing_output():
-    processed_file = 'processed_data/restaurants_processed.csv'
+    processed_file = 'processed_data/restaurants_processed.parquet'
     
     # Check if file exists
     if not os.path.exists(processed_file):
@@ -14,7 +16,7 @@ def test_preprocessing_output():
         return False
     
     # Load and check columns
-    df = pd.read_csv(processed_file)
+    df = read_processed(processed_file)
     required_cols = ['name', 'rate_float', 'approx_cost_two', 'document_string']
     
     for col in required_cols:
@@ -5,6 +5,7 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.llm.errors import LLMConfigurationError, LLMError
 from src.llm.groq_client import GroqService
 
 def test_groq_prompt_structure():
@@ -23,14 +24,13 @@ def test_groq_prompt_structure():
     service.client.chat.completions.create.assert_called_once()
 
 def test_groq_missing_api_key():
-    # Should handle missing key by returning an error message
+    # Should handle missing key by raising a typed configuration error
     service = GroqService(api_key=None)
-    # Ensure it doesn't crash but returns the expected error string
     with patch.dict(os.environ, {}, clear=True):
         service.api_key = None
         service.client = None
-        result = service.generate_recommendation("test", "test")
-        assert "GROQ_API_KEY not found" in result
+        with pytest.raises(LLMConfigurationError, match="GROQ_API_KEY not found"):
+            service.generate_recommendation("test", "test")
 
 def test_recommender_integration_logic():
     from src.llm.recommender import RecommendationEngine
@@ -54,3 +54,75 @@ def test_recommender_integration_logic():
     assert response == "LLM response"
     engine.searcher.search.assert_called_with("query", top_k=5, location="location", max_price=1000)
     engine.llm.generate_recommendation.assert_called()
+
+def test_groq_async_generation():
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    service = GroqService(api_key="mock_key")
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock(message=MagicMock(content="Async recommendation"))]
+    service.async_client.chat.completions.create = AsyncMock(return_value=mock_response)
+
+    result = asyncio.run(service.agenerate_recommendation("Indian food", "Context about Jalsa"))
+
+    assert result == "Async recommendation"
+    kwargs = service.async_client.chat.completions.create.call_args.kwargs
+    assert kwargs["messages"][1]["content"].count("Context about Jalsa") == 1
+
+def test_async_recommender_runs_retrieval_off_loop(fake_encoder, synthetic_store):
+    import asyncio
+    import threading
+    from unittest.mock import AsyncMock
+    from src.llm.recommender import RecommendationEngine, NO_RESULTS_MESSAGE
+
+    engine = RecommendationEngine(vector_store_path=synthetic_store, retrieval_workers=2)
+    search = engine.searcher.search
+    threads = []
+    def recording_search(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return search(*args, **kwargs)
+    engine.searcher.search = recording_search
+    engine.llm.agenerate_recommendation = AsyncMock(return_value="LLM response")
+
+    async def run():
+        return await asyncio.gather(
+            engine.aget_recommendations("pizza", location="Indiranagar"),
+            engine.aget_recommendations("sushi", location="Pluto Planet"),
+        )
+
+    found, missing = asyncio.run(run())
+    assert found == "LLM response"
+    assert missing == NO_RESULTS_MESSAGE
+    assert all(name.startswith("retrieval") for name in threads)
+    context = engine.llm.agenerate_recommendation.call_args.args[1]
+    assert context.splitlines()[1].startswith("1 | ")
+    assert engine.llm.agenerate_recommendation.call_args.kwargs["max_tokens"] > 0
+
+def _chunk(text):
+    return MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])
+
+def test_groq_streaming_yields_deltas():
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    service = GroqService(api_key="mock_key")
+    service.client.chat.completions.create = MagicMock(return_value=iter([_chunk("Try "), _chunk(None), _chunk("Jalsa")]))
+    assert list(service.stream_recommendation("Indian food", "Context")) == ["Try ", "Jalsa"]
+    assert service.client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    async def fake_stream():
+        for text in ["Try ", "Jalsa"]:
+            yield _chunk(text)
+
+    async def collect():
+        return [token async for token in service.astream_recommendation("Chinese food", "Context")]
+
+    service.async_client.chat.completions.create = AsyncMock(return_value=fake_stream())
+    assert asyncio.run(collect()) == ["Try ", "Jalsa"]
+
+def test_groq_streaming_raises_typed_errors():
+    service = GroqService(api_key="mock_key")
+    service.client.chat.completions.create = MagicMock(side_effect=RuntimeError("boom"))
+    with pytest.raises(LLMError, match="An error occurred while calling Groq: boom"):
+        list(service.stream_recommendation("q", "c"))
@@ -0,0 +1,130 @@
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.preprocess import preprocess_dataframe
+
+
+def legacy_preprocess(df):
+    """Row-wise reference: the original apply()-based cleaning, kept to prove output parity."""
+    df['cuisines'] = df['cuisines'].fillna('Not Specified')
+    df['rest_type'] = df['rest_type'].fillna('Not Specified')
+    df['dish_liked'] = df['dish_liked'].fillna('')
+    df['location'] = df['location'].fillna('Unknown')
+
+    def clean_rate(rate):
+        if isinstance(rate, str):
+            if '/' in rate:
+                rate = rate.split('/')[0].strip()
+            if rate == 'NEW' or rate == '-':
+                return 0.0
+            try:
+                return float(rate)
+            except:
+                return 0.0
+        return float(rate) if rate else 0.0
+
+    df['rate_float'] = df['rate'].apply(clean_rate)
+
+    def clean_cost(cost):
+        if isinstance(cost, str):
+            cost = cost.replace(',', '').strip()
+            try:
+                return int(cost)
+            except:
+                return 0
+        return int(cost) if cost else 0
+
+    df['approx_cost_two'] = df['approx_cost(for two people)'].apply(clean_cost)
+
+    def create_doc_string(row):
+        name = row.get('name', 'Unknown')
+        cuisines = row.get('cuisines', 'Various')
+        location = row.get('location', 'Unknown')
+        rate = row.get('rate_float', 0.0)
+        cost = row.get('approx_cost_two', 0)
+        rest_type = row.get('rest_type', 'Restaurant')
+        liked = row.get('dish_liked', '')
+
+        doc = f"{name} is a {rest_type} specializing in {cuisines}, located in {location}. "
+        doc += f"It has a rating of {rate}/5.0. "
+        if cost > 0:
+            doc += f"The approximate cost for two people is ₹{cost}. "
+        if liked:
+            doc += f"Customers particularly liked: {liked}."
+        return doc
+
+    df['document_string'] = df.apply(create_doc_string, axis=1)
+    return df
+
+
+RATES = ['4.1/5', '3.9 /5', ' 4.5/5 ', 'NEW', '-', None, '', 'abc/5', '3.7', '2.8/5', 4.2, 0,
+         # Forms float() accepts beyond plain decimals
+         '1_0.5/5', 'inf', '-Infinity/5', 'nan', ' 3.5\t/5', '\u0664.\u0665/5', '1e1_0']
+COSTS = ['800', '1,200', ' 300 ', '', None, '1.5', 'abc', '2,500', 450, 0,
+         '1_000', ' 1,2_00 ', 'inf', '+400', '\u0661\u0662\u0660\u0660', '_100']
+NAMES = ['Jalsa', 'Spice Elephant', "San Churro Cafe", 'Café Noir', None]
+LOCATIONS = ['Banashankari', 'Koramangala 5th Block', None, 'Indiranagar']
+CUISINES = ['North Indian, Mughlai', 'Cafe, Italian', None]
+REST_TYPES = ['Casual Dining', 'Quick Bites', None]
+LIKED = ['Pasta, Lunch Buffet', '', None, 'Masala Dosa']
+
+
+def raw_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    pick = lambda values: [values[i] for i in rng.integers(0, len(values), n)]
+    return pd.DataFrame({
+        'name': pd.Series(pick(NAMES), dtype=object),
+        'location': pd.Series(pick(LOCATIONS), dtype=object),
+        'rest_type': pd.Series(pick(REST_TYPES), dtype=object),
+        'cuisines': pd.Series(pick(CUISINES), dtype=object),
+        'dish_liked': pd.Series(pick(LIKED), dtype=object),
+        'rate': pd.Series(pick(RATES), dtype=object),
+        'approx_cost(for two people)': pd.Series(pick(COSTS), dtype=object),
+    })
+
+
+def to_csv_text(df):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+def test_vectorized_output_matches_legacy_csv():
+    raw = raw_frame(3000)
+    expected = legacy_preprocess(raw.copy())
+    actual = preprocess_dataframe(raw.copy())
+    assert to_csv_text(actual) == to_csv_text(expected)
+
+
+def test_string_only_and_numeric_only_columns():
+    raw = raw_frame(200, seed=1)
+    raw['rate'] = pd.Series(['4.1/5'] * 200, dtype=object)
+    raw['approx_cost(for two people)'] = pd.Series([300] * 200, dtype=object)
+    assert to_csv_text(preprocess_dataframe(raw.copy())) == to_csv_text(legacy_preprocess(raw.copy()))
+
+
+def compare_timings(n_rows=200_000):
+    raw = raw_frame(n_rows)
+    # The Hugging Face dataset stores rate and cost as strings (or null), like this
+    for col in ['rate', 'approx_cost(for two people)']:
+        raw[col] = pd.Series([v if v is None else str(v) for v in raw[col]], dtype=object)
+    start = time.perf_counter()
+    legacy_preprocess(raw.copy())
+    legacy_s = time.perf_counter() - start
+    start = time.perf_counter()
+    preprocess_dataframe(raw.copy())
+    vectorized_s = time.perf_counter() - start
+    print(f"{n_rows} rows: row-wise {legacy_s:.2f}s, vectorized {vectorized_s:.2f}s "
+          f"({legacy_s / vectorized_s:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    compare_timings()
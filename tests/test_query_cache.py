@@ -0,0 +1,52 @@
+import pytest
+
+from src.cache import LRUCache
+from src.vector_db.search import RestaurantSearch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_cache_ttl_expiry():
+    clock = FakeClock()
+    cache = LRUCache(max_size=10, ttl=60, clock=clock)
+    cache.set("pizza", 1)
+    clock.now = 59
+    assert cache.get("pizza") == 1
+    clock.now = 61
+    assert cache.get("pizza") is None
+    assert len(cache) == 0
+
+
+def test_repeated_queries_skip_the_encoder(fake_encoder, synthetic_store):
+    searcher = RestaurantSearch(vector_store_path=synthetic_store)
+    first = searcher.search("Pizza", top_k=3)
+    second = searcher.search("  pizza ", top_k=3)
+    searcher.search("pizza", top_k=3, location="Indiranagar")
+    assert searcher.model.calls == 1
+    assert list(first.index) == list(second.index)
+    assert searcher.query_cache.stats()["hits"] == 2
+
+
+def test_query_cache_can_be_disabled(fake_encoder, synthetic_store):
+    searcher = RestaurantSearch(vector_store_path=synthetic_store, query_cache_size=0)
+    searcher.search("pizza")
+    searcher.search("pizza")
+    assert searcher.model.calls == 2
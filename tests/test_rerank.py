@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+
+from src.vector_db.rerank import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words appear in the document."""
+
+    def __init__(self, *args, **kwargs):
+        self.batches = []
+
+    def predict(self, pairs, **kwargs):
+        self.batches.append(len(pairs))
+        return [sum(word in doc.lower() for word in query.lower().split()) for query, doc in pairs]
+
+
+class StepClock:
+    """Advances a fixed number of milliseconds every time it is read."""
+
+    def __init__(self, step_ms):
+        self.now = 0.0
+        self.step = step_ms / 1000
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+@pytest.fixture
+def fake_cross_encoder(monkeypatch):
+    import src.vector_db.rerank as rerank_module
+    monkeypatch.setattr(rerank_module, 'cross_encoder', FakeCrossEncoder)
+    return FakeCrossEncoder
+
+
+def candidates():
+    docs = ["Noodle Bar serves Hakka noodles", "Dosa Corner", "Truffles: burgers and ghee roast",
+            "Udupi Grand", "Ghee Roast House, famous ghee roast"]
+    return pd.DataFrame({'name': [f"R{i}" for i in range(len(docs))], 'document_string': docs})
+
+
+def test_rerank_orders_by_cross_encoder_in_batches(fake_cross_encoder):
+    reranker = CrossEncoderReranker(top_k=2, batch_size=2, budget_ms=1000)
+    result = reranker.rerank("ghee roast", candidates())
+    assert result['name'].tolist() == ['R2', 'R4']
+    assert reranker.model.batches == [2, 2, 1]
+    assert reranker.stats() == {'reranked': 1, 'fallbacks': 0}
+
+
+def test_rerank_caps_candidates(fake_cross_encoder):
+    reranker = CrossEncoderReranker(max_candidates=3, top_k=3, budget_ms=1000)
+    result = reranker.rerank("ghee roast", candidates())
+    assert sum(reranker.model.batches) == 3
+    assert 'R4' not in result['name'].tolist()
+
+
+def test_budget_exhaustion_returns_bi_encoder_order(fake_cross_encoder):
+    # Each clock read costs 40ms, so the 100ms budget runs out before the last batch
+    reranker = CrossEncoderReranker(top_k=2, batch_size=2, budget_ms=100, clock=StepClock(40))
+    result = reranker.rerank("ghee roast", candidates())
+    assert result['name'].tolist() == ['R0', 'R1']
+    assert reranker.stats() == {'reranked': 0, 'fallbacks': 1}
+
+
+def test_reranker_is_opt_in(monkeypatch):
+    monkeypatch.delenv("RERANKER_MODEL", raising=False)
+    assert CrossEncoderReranker.from_env() is None
+    monkeypatch.setenv("RERANKER_MODEL", "some/cross-encoder")
+    monkeypatch.setenv("RERANK_TOP_K", "2")
+    reranker = CrossEncoderReranker.from_env()
+    assert reranker.model_name == "some/cross-encoder" and reranker.top_k == 2
+
+
+def test_engine_sends_reranked_candidates_to_llm(fake_encoder, fake_cross_encoder, synthetic_store):
+    from src.llm.recommender import RecommendationEngine
+
+    reranker = CrossEncoderReranker(max_candidates=10, top_k=2, budget_ms=1000)
+    engine = RecommendationEngine(vector_store_path=synthetic_store, reranker=reranker)
+    engine.llm.generate_recommendation = MagicMock(return_value="LLM response")
+
+    assert engine.get_recommendations("ghee roast burgers") == "LLM response"
+    query, context = engine.llm.generate_recommendation.call_args[0]
+    rows = context.splitlines()[1:]
+    assert len(rows) == 2
+    assert "Truffles" in rows[0]
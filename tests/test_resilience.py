@@ -0,0 +1,237 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import groq
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.llm.errors import LLMRateLimitError, LLMRequestError, LLMTimeoutError, LLMUnavailableError
+from src.llm.groq_client import GroqService
+from src.llm.resilience import LLM_HEDGES, RateLimiter, ResilientCaller, RetryPolicy, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _status_error(cls, status, headers=None):
+    response = httpx.Response(status, headers=headers, request=httpx.Request('POST', 'https://api.groq.com'))
+    return cls(f"HTTP {status}", response=response, body=None)
+
+
+def test_token_buckets_pace_requests_and_tokens():
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=2, tpm=1000, clock=clock)
+    assert limiter.reserve(100, max_wait=60) == 0
+    assert limiter.reserve(100, max_wait=60) == 0
+    # Third request in the same minute waits for one request's worth of refill
+    assert limiter.reserve(100, max_wait=60) == pytest.approx(30)
+    with pytest.raises(LLMRateLimitError) as raised:
+        limiter.reserve(100, max_wait=1)
+    assert raised.value.retry_after > 1
+
+    bucket = TokenBucket(600, clock=clock)
+    bucket.take(600)
+    assert bucket.wait_time(100) == pytest.approx(10)
+    bucket.credit(100)
+    assert bucket.wait_time(100) == 0
+
+
+def test_retries_5xx_with_backoff_then_succeeds():
+    clock = FakeClock()
+    caller = ResilientCaller(retry=RetryPolicy(max_attempts=3, base_delay=0.5), clock=clock, sleep=clock.sleep)
+    fn = MagicMock(side_effect=[_status_error(groq.InternalServerError, 503), groq.APIConnectionError(
+        request=httpx.Request('POST', 'https://api.groq.com')), "ok"])
+    assert caller.call(fn) == "ok"
+    assert fn.call_count == 3
+    assert 0 <= clock.now <= 0.5 + 1.0
+
+
+def test_client_errors_are_not_retried():
+    caller = ResilientCaller(sleep=MagicMock())
+    fn = MagicMock(side_effect=_status_error(groq.BadRequestError, 400))
+    with pytest.raises(LLMRequestError):
+        caller.call(fn)
+    assert fn.call_count == 1
+
+
+def test_retry_after_beyond_the_deadline_fails_fast():
+    clock = FakeClock()
+    caller = ResilientCaller(deadline_s=5, clock=clock, sleep=clock.sleep)
+    fn = MagicMock(side_effect=_status_error(groq.RateLimitError, 429, {'retry-after': '30'}))
+    with pytest.raises(LLMRateLimitError) as raised:
+        caller.call(fn)
+    assert raised.value.retry_after == 30 and clock.now == 0 and fn.call_count == 1
+
+
+def test_exhausted_retries_raise_the_last_typed_error():
+    caller = ResilientCaller(retry=RetryPolicy(max_attempts=2, base_delay=0.001))
+    fn = MagicMock(side_effect=_status_error(groq.InternalServerError, 500))
+    with pytest.raises(LLMUnavailableError):
+        caller.call(fn)
+    assert fn.call_count == 2
+
+
+def test_async_deadline_cuts_off_a_hung_call():
+    caller = ResilientCaller(deadline_s=0.05, retry=RetryPolicy(max_attempts=1))
+
+    async def hang(timeout):
+        await asyncio.sleep(5)
+
+    start = time.perf_counter()
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(caller.acall(hang))
+    assert time.perf_counter() - start < 1
+
+
+def test_async_hedge_wins_when_primary_stalls():
+    caller = ResilientCaller(hedge_after_s=0.02)
+    attempts = []
+
+    async def call(timeout):
+        attempts.append(timeout)
+        await asyncio.sleep(2 if len(attempts) == 1 else 0.01)
+        return f"answer {len(attempts)}"
+
+    hedges = LLM_HEDGES.value()
+    start = time.perf_counter()
+    assert asyncio.run(caller.acall(call)) == "answer 2"
+    assert time.perf_counter() - start < 1
+    assert LLM_HEDGES.value() == hedges + 1
+
+
+def test_no_hedge_without_quota_and_sync_calls_never_hedge():
+    clock = FakeClock()
+    limited = ResilientCaller(hedge_after_s=0.0, limiter=RateLimiter(rpm=1, clock=clock))
+    attempts = []
+
+    async def call(timeout):
+        attempts.append(timeout)
+        await asyncio.sleep(0.01)
+        return "only"
+
+    # With the limiter out of quota the duplicate is skipped and the primary is awaited
+    assert asyncio.run(limited.acall(call)) == "only" and len(attempts) == 1
+
+    single = MagicMock(return_value="only")
+    assert ResilientCaller(hedge_after_s=0.0).call(single) == "only" and single.call_count == 1
+
+
+def test_failed_attempts_and_losing_hedges_return_their_tokens():
+    clock = FakeClock()
+    limiter = RateLimiter(tpm=1000, clock=clock)
+    caller = ResilientCaller(limiter=limiter, clock=clock, sleep=clock.sleep)
+    connection_error = groq.APIConnectionError(request=httpx.Request('POST', 'https://api.groq.com'))
+    fn = MagicMock(side_effect=[connection_error, connection_error, "ok"])
+    assert caller.call(fn, tokens=100) == "ok"
+    # The winner keeps its reservation until usage is settled: 100 reserved, 50 used
+    caller.refund(50)
+    assert limiter.tokens.tokens == pytest.approx(950, abs=1)
+
+    # Primary and hedge each reserve 100; the cancelled primary gives its share back
+    hedged = ResilientCaller(limiter=RateLimiter(tpm=1000), hedge_after_s=0.01)
+    attempts = []
+
+    async def call(timeout):
+        attempts.append(timeout)
+        await asyncio.sleep(2 if len(attempts) == 1 else 0.01)
+        return f"answer {len(attempts)}"
+
+    assert asyncio.run(hedged.acall(call, tokens=100)) == "answer 2"
+    assert hedged.limiter.tokens.tokens == pytest.approx(900, abs=1)
+
+
+def test_request_never_sent_returns_its_rpm_slot():
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=60, clock=clock)
+    limiter.requests.tokens = 0.5
+    # Admitted after a 0.5s throttle wait, but the sleep overruns the 1s deadline
+    caller = ResilientCaller(limiter=limiter, deadline_s=1, clock=clock, sleep=lambda s: clock.sleep(5))
+    fn = MagicMock()
+    with pytest.raises(LLMTimeoutError):
+        caller.call(fn)
+    assert fn.call_count == 0
+    assert limiter.requests.tokens == pytest.approx(0.5 - 1 + 5 + 1)
+
+
+def test_max_attempts_must_be_positive(monkeypatch):
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
+    monkeypatch.setenv("GROQ_MAX_ATTEMPTS", "0")
+    with pytest.raises(ValueError):
+        ResilientCaller.from_env()
+
+
+def test_adaptive_hedge_delay_follows_observed_latency():
+    caller = ResilientCaller(hedge_quantile=0.95)
+    assert caller.hedge_delay() is None
+    for ms in range(1, 101):
+        caller.latency.record(ms / 1000)
+    assert caller.hedge_delay() == pytest.approx(0.095, abs=0.002)
+
+
+def test_service_uses_pooled_clients_without_sdk_retries():
+    service = GroqService(api_key="mock_key")
+    assert service.client.max_retries == 0 and service.async_client.max_retries == 0
+    response = MagicMock(choices=[MagicMock(message=MagicMock(content="Try Jalsa"))])
+    service.client.chat.completions.create = MagicMock(return_value=response)
+    service.generate_recommendation("q", "c", max_tokens=200)
+    assert service.client.chat.completions.create.call_args.kwargs['timeout'] > 0
+
+
+def test_api_maps_typed_errors_to_status_codes(monkeypatch):
+    from src.api.main import app
+
+    engine = MagicMock(aclose=AsyncMock())
+    engine.aget_recommendations = AsyncMock(side_effect=LLMRateLimitError("throttled", retry_after=2.5))
+
+    async def failing_stream(**kwargs):
+        raise LLMTimeoutError("too slow")
+        yield
+
+    engine.astream_recommendations = failing_stream
+    monkeypatch.setattr(app.state, 'engine_factory', lambda: engine, raising=False)
+    with TestClient(app) as client:
+        while client.get("/readyz").json()["status"] == "starting":
+            time.sleep(0.01)
+        response = client.post("/recommend", json={"query": "biryani"})
+        assert response.status_code == 503 and response.headers['Retry-After'] == '3'
+        assert response.json()['error'] == 'LLMRateLimitError'
+
+        streamed = client.post("/recommend/stream", json={"query": "biryani"})
+        assert streamed.status_code == 504 and streamed.json()['error'] == 'LLMTimeoutError'
+
+
+def test_abandoned_stream_is_closed_and_settled():
+    from src.llm.groq_client import LLM_REQUESTS, _request_tokens
+
+    clock = FakeClock()
+    limiter = RateLimiter(tpm=10000, clock=clock)
+    service = GroqService(api_key="mock_key", caller=ResilientCaller(limiter=limiter, clock=clock))
+    closed = []
+
+    def chunks():
+        try:
+            for text in ["Try ", "Jalsa", " or Truffles"]:
+                yield MagicMock(choices=[MagicMock(delta=MagicMock(content=text))], x_groq=None, usage=None)
+        finally:
+            closed.append(True)
+
+    service.client.chat.completions.create = MagicMock(return_value=chunks())
+    cancelled = LLM_REQUESTS.value(outcome='cancelled')
+    stream = service.stream_recommendation("q", "c", max_tokens=200)
+    assert next(stream) == "Try "
+    stream.close()  # what a disconnecting consumer does
+    reserved = _request_tokens(service._completion_kwargs("q", "c", stream=True, max_tokens=200))
+    # Everything but the prompt and the one streamed token goes back to the bucket
+    assert limiter.tokens.tokens == pytest.approx(10000 - (reserved - 200) - 1)
+    assert closed == [True] and LLM_REQUESTS.value(outcome='cancelled') == cancelled + 1
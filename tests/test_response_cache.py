@@ -0,0 +1,97 @@
+import os
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.llm.errors import LLMError
+from src.llm.groq_client import GroqService
+from src.llm.response_cache import ResponseCache, DiskCacheBackend, make_cache_key
+
+
+def _service(cache):
+    service = GroqService(api_key="mock_key", cache=cache)
+    response = MagicMock()
+    response.choices = [MagicMock(message=MagicMock(content="Try Jalsa"))]
+    service.client.chat.completions.create = MagicMock(return_value=response)
+    return service
+
+
+def test_identical_requests_hit_the_cache():
+    service = _service(ResponseCache(max_size=8, ttl=60))
+    assert service.generate_recommendation("biryani", "1. Meghana Foods") == "Try Jalsa"
+    assert service.generate_recommendation("biryani", "1. Meghana Foods") == "Try Jalsa"
+    assert service.client.chat.completions.create.call_count == 1
+    # A different retrieved context is a different prompt
+    service.generate_recommendation("biryani", "1. Empire")
+    assert service.client.chat.completions.create.call_count == 2
+
+
+def test_errors_are_never_cached():
+    service = _service(ResponseCache(max_size=8, ttl=60))
+    service.client.chat.completions.create.side_effect = [RuntimeError("rate limited"), service.client.chat.completions.create.return_value]
+    with pytest.raises(LLMError, match="An error occurred while calling Groq"):
+        service.generate_recommendation("pizza", "ctx")
+    assert service.generate_recommendation("pizza", "ctx") == "Try Jalsa"
+    assert service.cache.stats()["size"] == 1
+
+
+def test_cache_key_ignores_stream_flag():
+    service = GroqService(api_key="mock_key", cache=ResponseCache())
+    plain = service._completion_kwargs("q", "c")
+    streamed = service._completion_kwargs("q", "c", stream=True)
+    assert make_cache_key(plain) == make_cache_key(streamed)
+    assert make_cache_key(plain) != make_cache_key(service._completion_kwargs("q", "other"))
+
+
+def test_disk_backend_survives_restart(tmp_path):
+    path = str(tmp_path / "cache" / "responses.sqlite")
+    service = _service(ResponseCache(max_size=8, ttl=60, disk_path=path))
+    service.generate_recommendation("dosa", "ctx")
+    assert os.path.exists(path)
+
+    restarted = _service(ResponseCache(max_size=8, ttl=60, disk_path=path))
+    assert restarted.generate_recommendation("dosa", "ctx") == "Try Jalsa"
+    restarted.client.chat.completions.create.assert_not_called()
+
+
+def test_disk_backend_ttl_and_size_bound(tmp_path):
+    now = [0.0]
+    backend = DiskCacheBackend(str(tmp_path / "c.sqlite"), max_size=2, ttl=10, clock=lambda: now[0])
+    backend.set("a", "1")
+    now[0] = 1
+    backend.set("b", "2")
+    now[0] = 2
+    backend.set("c", "3")
+    assert backend.get("a") is None
+    assert backend.get("c") == "3"
+    now[0] = 20
+    assert backend.get("c") is None
+
+
+def test_disk_backend_reuses_one_connection_and_touches_coarsely(tmp_path):
+    now = [0.0]
+    backend = DiskCacheBackend(str(tmp_path / "c.sqlite"), max_size=2, clock=lambda: now[0], touch_interval=5)
+    backend.set("a", "1")
+    now[0] = 1
+    backend.set("b", "2")
+    now[0] = 3
+    assert backend.get("b") == "2"  # too soon to refresh b's recency
+    now[0] = 6
+    assert backend.get("a") == "1"  # refreshed: a is now the most recently used
+    now[0] = 7
+    backend.set("c", "3")
+    assert backend.get("b") is None and backend.get("a") == "1"
+
+    backend.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        backend.get("a")
+
+
+def test_completed_stream_is_cached_for_later_requests():
+    service = GroqService(api_key="mock_key", cache=ResponseCache(max_size=8, ttl=60))
+    chunks = [MagicMock(choices=[MagicMock(delta=MagicMock(content=t))]) for t in ["Try ", "Jalsa"]]
+    service.client.chat.completions.create = MagicMock(return_value=iter(chunks))
+    assert "".join(service.stream_recommendation("q", "c")) == "Try Jalsa"
+    assert service.generate_recommendation("q", "c") == "Try Jalsa"
+    assert service.client.chat.completions.create.call_count == 1
@@ -0,0 +1,39 @@
+import pytest
+
+from src.vector_db.search import RestaurantSearch
+
+
+@pytest.fixture
+def searcher(fake_encoder, synthetic_store):
+    return RestaurantSearch(vector_store_path=synthetic_store)
+
+
+def test_search_batch_matches_single_searches(searcher):
+    queries = ["pizza", "masala dosa", "north indian", "sushi", "biryani"]
+    filters = [
+        {},
+        {'location': 'Jayanagar'},
+        {'location': 'Banashankari', 'max_price': 1000, 'min_rating': 3.6},
+        {'location': 'Pluto Planet'},
+        {'max_price': 800},
+    ]
+    batch = searcher.search_batch(queries, top_k=3, filters=filters)
+    assert len(batch) == len(queries)
+    for query, f, result in zip(queries, filters, batch):
+        single = searcher.search(query, top_k=3, **f)
+        assert list(result.index) == list(single.index)
+
+
+def test_search_batch_encodes_once(searcher):
+    searcher.search_batch(["pizza", "dosa", "Pizza", "biryani"], top_k=2)
+    assert searcher.model.calls == 1
+    searcher.search_batch(["pizza", "dosa"], top_k=2)
+    assert searcher.model.calls == 1
+
+
+def test_search_batch_shared_filters_and_validation(searcher):
+    results = searcher.search_batch(["pizza", "coffee"], top_k=2, filters={'location': 'Indiranagar'})
+    for result in results:
+        assert (result['location'] == 'Indiranagar').all()
+    with pytest.raises(ValueError):
+        searcher.search_batch(["pizza", "coffee"], filters=[{}])
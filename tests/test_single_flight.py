@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.llm.groq_client import GroqService
+from src.llm.response_cache import ResponseCache
+from src.llm.single_flight import SingleFlight
+
+
+def _response(text):
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=text))])
+
+
+def test_concurrent_sync_callers_share_one_groq_call():
+    service = GroqService(api_key="mock_key", cache=ResponseCache(max_size=0))
+    release = threading.Event()
+
+    def slow_create(**kwargs):
+        release.wait(5)
+        return _response("Try Meghana Foods")
+    service.client.chat.completions.create = MagicMock(side_effect=slow_create)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        service.generate_recommendation("biryani near me", "1 | Meghana Foods"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while service.inflight.stats()['coalesced'] < 7:
+        time.sleep(0.005)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["Try Meghana Foods"] * 8
+    assert service.client.chat.completions.create.call_count == 1
+    assert service.inflight.stats() == {'leaders': 1, 'coalesced': 7, 'in_flight': 0}
+
+    # Once the call has finished, the next identical request goes upstream again (no cache here)
+    service.generate_recommendation("biryani near me", "1 | Meghana Foods")
+    assert service.client.chat.completions.create.call_count == 2
+
+
+def test_concurrent_async_callers_share_one_groq_call():
+    service = GroqService(api_key="mock_key", cache=ResponseCache(max_size=0))
+    calls = []
+
+    async def slow_create(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        return _response("Try Empire")
+    service.async_client.chat.completions.create = slow_create
+
+    async def run():
+        same = [service.agenerate_recommendation("biryani", "1 | Empire") for _ in range(6)]
+        other = service.agenerate_recommendation("dosa", "1 | CTR")
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(run())
+    assert results == ["Try Empire"] * 7
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight('test')
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.ado('k', work))
+        second = asyncio.ensure_future(flight.ado('k', work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+    assert len(started) == 1 and flight.stats()['in_flight'] == 0
+
+
+def test_leader_exception_reaches_every_waiter():
+    flight = SingleFlight('test')
+    entered = threading.Event()
+
+    def failing():
+        entered.set()
+        time.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def follower():
+        entered.wait(5)
+        try:
+            flight.do('k', failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        flight.do('k', failing)
+    thread.join()
+    assert errors == ["upstream down"]
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_coalescing_can_be_disabled():
+    service = GroqService(api_key="mock_key", cache=ResponseCache(max_size=0), coalesce=False)
+    service.client.chat.completions.create = MagicMock(return_value=_response("ok"))
+    assert service.generate_recommendation("q", "c") == "ok"
+    assert service.inflight is None
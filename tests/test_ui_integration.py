@@ -8,10 +8,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 def test_ui_data_dependency():
     """Verify that the UI can access the metadata for the location dropdown."""
-    metadata_path = 'vector_store/metadata.pkl'
+    from src.data.artifacts import read_metadata
+    metadata_path = 'vector_store/metadata.arrow'
     assert os.path.exists(metadata_path), "Vector store metadata missing! Run Phase 2 first."
     
-    df = pd.read_pickle(metadata_path)
+    df = read_metadata(metadata_path, columns=['location'])
     assert not df.empty
     assert 'location' in df.columns
     unique_locations = df['location'].unique()